@@ -16,6 +16,12 @@ PORT_OUT_DIGIT = 0
 PORT_OUT_STRING = 1
 PORT_OUT_CHAR = 2
 
+BYTE_NEWLINE = 10  # '\n' — терминатор строки для IN_READLINE_BUF
+
+# Порог уплотнения буфера ввода: прочитанный префикс отрезается, только
+# когда он длиннее порога и занимает больше половины буфера
+INPUT_COMPACT_THRESHOLD = 64
+
 SYS_SET_HANDLER = 0x80
 SYS_ENABLE_INTERRUPTS = 0x81
 SYS_DISABLE_INTERRUPTS = 0x82
@@ -121,7 +127,19 @@ class IOController:
         """Запланировать ввод данных на определенном такте."""
         self.interrupt_schedule.append((cycle, InterruptType.INPUT_READY.value, data))
         self.interrupt_schedule.sort()
-    
+
+    def schedule_inputs(self, events: List[Tuple[int, int]]) -> None:
+        """Запланировать пакет событий ввода (cycle, data).
+
+        Один extend и одна сортировка вместо пересортировки расписания
+        после каждого события, как делает schedule_input в цикле.
+        """
+        input_ready = InterruptType.INPUT_READY.value
+        self.interrupt_schedule.extend(
+            (cycle, input_ready, data) for cycle, data in events
+        )
+        self.interrupt_schedule.sort()
+
     def update(self, cycle: int) -> List[Tuple[InterruptType, int]]:
         """Обновить состояние на такте и вернуть список прерываний."""
         self.current_cycle = cycle
@@ -353,15 +371,23 @@ class StackProcessor:
         self.cycle_count = 0
         self.instruction_count = 0
         
-        # IO буферы
-        self.input_buffer: List[int] = []
-        self.output_buffer: List[int] = []
+        # IO буферы. Буфер ввода — bytearray плюс курсор чтения: байт
+        # хранится одним байтом вместо боксированного int, при этом чтение
+        # не сдвигает хвост, как list.pop(0)
+        self.input_buffer: bytearray = bytearray()
+        self._input_head: int = 0
+        # Буфер вывода — тоже bytearray: значение порта занимает байт
+        # вместо боксированного int, при этом result['output'] отдаётся bytes
+        self.output_buffer: bytearray = bytearray()
         
         # Векторный процессор
         self.vector_unit = VectorProcessor()
         
-        # Логгер
+        # Логгер. При потоковой записи (run(log_file=...)) журнал
+        # сбрасывается в бинарный файл пакетами и не копится в памяти
         self.execution_log: List[str] = []
+        self._log_stream: Any = None
+        self._log_batch: int = EXEC_LOG_MAX_LEN
 
         # Потактовая модель
         self.current_instruction: Instruction | None = None
@@ -376,6 +402,35 @@ class StackProcessor:
         self.interrupt_handlers: Dict[int, int] = {}
         self.pending_interrupts: List[Tuple[int, int]] = []  # (vector, data)
     
+    def reset(self) -> None:
+        """Вернуть процессор в исходное состояние без перевыделения памяти.
+
+        Память данных зануляется на месте (bytearray переиспользуется),
+        стеки и буферы очищаются — экземпляр готов к следующей программе.
+        """
+        self.instruction_memory = []
+        self.data_memory[:] = bytes(len(self.data_memory))
+        self.stack.clear()
+        self.call_stack.clear()
+        self.pc = 0
+        self.state = ProcessorState.RUNNING
+        self.cycle_count = 0
+        self.instruction_count = 0
+        self.input_buffer.clear()
+        self._input_head = 0
+        self.output_buffer.clear()
+        self.vector_unit = VectorProcessor()
+        self.execution_log.clear()
+        self._log_stream = None
+        self._log_batch = EXEC_LOG_MAX_LEN
+        self.current_instruction = None
+        self.remaining_cycles = 0
+        self.io_controller = IOController()
+        self.interrupts_enabled = False
+        self.in_interrupt = False
+        self.interrupt_handlers.clear()
+        self.pending_interrupts.clear()
+
     def load_program(self, instructions: List[Instruction]) -> None:
         """Загрузить программу в память команд."""
         self.instruction_memory = instructions
@@ -401,7 +456,26 @@ class StackProcessor:
             raise ProcessorError("Стек пуст")
         
         return self.stack.pop()
-    
+
+    def _read_input_byte(self) -> int:
+        """Прочитать байт из буфера ввода (0, если буфер пуст).
+
+        Чтение двигает курсор вместо pop(0), который сдвигал бы весь
+        хвост буфера; прочитанная часть отрезается, когда курсор
+        переваливает за середину достаточно большого буфера.
+        """
+        head = self._input_head
+        buffer = self.input_buffer
+        if head >= len(buffer):
+            return 0
+        value = buffer[head]
+        head += 1
+        if head > INPUT_COMPACT_THRESHOLD and head * 2 > len(buffer):
+            del buffer[:head]
+            head = 0
+        self._input_head = head
+        return value
+
     def read_memory_word(self, address: int) -> int:
         """Читать 32-битное слово из памяти данных."""
         if address < 0 or address + 4 > len(self.data_memory):
@@ -590,6 +664,20 @@ class StackProcessor:
                 address = self.pop()
                 value = self.pop()
                 self.write_memory_word(address, value)
+            elif opcode == Opcode.LOAD_DIRECT:
+                self.push(self.read_memory_word(operand))
+            elif opcode == Opcode.STORE_DIRECT:
+                self.write_memory_word(operand, self.pop())
+            elif opcode == Opcode.LOAD_ELEM:
+                # Адрес элемента вектора [size][elem0]...: base + 4 + index*4
+                index = self.pop()
+                base = self.pop()
+                self.push(self.read_memory_word(base + 4 + index * 4))
+            elif opcode == Opcode.STORE_ELEM:
+                index = self.pop()
+                base = self.pop()
+                value = self.pop()
+                self.write_memory_word(base + 4 + index * 4, value)
             elif opcode == Opcode.STOREB:
                 address = self.pop()
                 value = self.pop() & 0xFF
@@ -599,13 +687,27 @@ class StackProcessor:
             
             # Port I/O with interrupts
             elif opcode == Opcode.IN:
-                # Читаем из входного буфера
-                if self.input_buffer:
-                    value = self.input_buffer.pop(0)
-                    self.push(value)
-                else:
-                    # Если нет данных, ждем прерывание или возвращаем 0
-                    self.push(0)
+                # Читаем из входного буфера (0, если данных нет)
+                self.push(self._read_input_byte())
+            
+            elif opcode == Opcode.IN_READLINE_BUF:
+                # Вся петля чтения строки выполняется внутри процессора:
+                # одна инструкция вместо ~14 диспетчеризаций на символ
+                max_len = self.pop()
+                addr = self.pop()
+                count = 0
+                while count < max_len - 1:
+                    value = self._read_input_byte()
+                    if value in (0, BYTE_NEWLINE):
+                        break
+                    if addr < 0 or addr >= len(self.data_memory):
+                        _error(f"Неверный адрес памяти: {addr}")
+                    self.data_memory[addr] = value & 0xFF
+                    addr += 1
+                    count += 1
+                # Терминатор строки
+                if 0 <= addr < len(self.data_memory):
+                    self.data_memory[addr] = 0
             
             elif opcode == Opcode.OUT:
                 value = self.pop()
@@ -631,7 +733,7 @@ class StackProcessor:
                     self.output_buffer.append(value & 0xFF)
                 else:
                     # По умолчанию выводим сырое значение (как байт)
-                    self.output_buffer.append(value)
+                    self.output_buffer.append(value & 0xFF)
             
             # Прерывания
             elif opcode == Opcode.INT:
@@ -829,7 +931,8 @@ class StackProcessor:
         # Обновляем контроллер ввода-вывода и принимаем события ввода
         for int_type, data in self.io_controller.update(self.cycle_count):
             if int_type == InterruptType.INPUT_READY:
-                self.input_buffer.append(data)
+                # Вход байтовый: значение события усекается до байта
+                self.input_buffer.append(data & 0xFF)
                 # Формируем запрос прерывания на вектор 0 (ввод готов)
                 self.pending_interrupts.append((InterruptType.INPUT_READY.value, data))
 
@@ -871,21 +974,36 @@ class StackProcessor:
         # Продолжаем выполнение (инструкция ещё не завершена)
         return True
     
-    def run(self, max_cycles: int = 1000000) -> Dict[str, Any]:
-        """Запустить выполнение программы."""
+    def run(self, max_cycles: int = 1000000, log_file: Any = None,
+            log_batch: int = 4096) -> Dict[str, Any]:
+        """Запустить выполнение программы.
+
+        Если передан log_file (бинарный файловый объект), журнал тактов
+        пишется в него пакетами по log_batch строк прямо во время
+        выполнения и не накапливается в памяти — result['execution_log']
+        в этом режиме остаётся пустым. Иначе журнал копится в списке
+        с усечением до EXEC_LOG_MAX_LEN, как раньше.
+        """
         start_cycle = self.cycle_count
-        
-        while self.cycle_count - start_cycle < max_cycles:
-            if not self.step():
-                break
-        
+        self._log_stream = log_file
+        self._log_batch = log_batch
+
+        try:
+            while self.cycle_count - start_cycle < max_cycles:
+                if not self.step():
+                    break
+        finally:
+            if log_file is not None:
+                self._flush_log(log_file)
+                self._log_stream = None
+
         return {
             'state': self.state.value,
             'instructions_executed': self.instruction_count,
             'cycles_executed': self.cycle_count - start_cycle,
             'final_pc': self.pc,
             'stack_size': len(self.stack),
-            'output': self.output_buffer.copy(),
+            'output': bytes(self.output_buffer),
             'execution_log': self.execution_log.copy(),
         }
     
@@ -897,11 +1015,28 @@ class StackProcessor:
                     f"Stack[{len(self.stack)}] {stack_top}")
         
         self.execution_log.append(log_entry)
-        
-        # Ограничиваем размер лога
-        if len(self.execution_log) > EXEC_LOG_MAX_LEN:
+
+        stream = self._log_stream
+        if stream is not None:
+            # Потоковый режим: пакетная выгрузка вместо усечения — журнал
+            # уходит в файл целиком, память ограничена размером пакета
+            if len(self.execution_log) >= self._log_batch:
+                self._flush_log(stream)
+        elif len(self.execution_log) > EXEC_LOG_MAX_LEN:
+            # Ограничиваем размер лога
             self.execution_log = self.execution_log[-EXEC_LOG_TRIM_TO:]
 
+    def _flush_log(self, stream: Any) -> None:
+        """Сбросить накопленные строки журнала в бинарный поток."""
+        log = self.execution_log
+        if log:
+            stream.write("".join(line + "\n" for line in log).encode())
+            log.clear()
+
     def schedule_input_event(self, cycle: int, data: int) -> None:
         """Запланировать поступление байта ввода на указанном такте."""
-        self.io_controller.schedule_input(cycle, data)
\ No newline at end of file
+        self.io_controller.schedule_input(cycle, data)
+
+    def schedule_input_events(self, events: List[Tuple[int, int]]) -> None:
+        """Запланировать пакет событий ввода (cycle, data) одним вызовом."""
+        self.io_controller.schedule_inputs(events)
\ No newline at end of file
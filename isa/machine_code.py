@@ -1,11 +1,29 @@
 """Work with machine code in binary format."""
 
+import os
 import struct
 from pathlib import Path
 from typing import List
 
 from .opcodes import Opcode, get_opcode_name, INSTRUCTION_SIZES
 
+# Предразобранный формат 32-битного слова (little-endian): struct.pack
+# парсит формат-строку на каждый вызов, Struct — один раз
+_WORD = struct.Struct('<I')
+
+
+def _write_bytes(file_path: str, payload: bytes) -> None:
+    """Записать готовый байтовый буфер в файл одним os.write.
+
+    Для уже собранного blob буферизация io.BufferedWriter — лишняя
+    копия; os.open/os.write пишут напрямую.
+    """
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, payload)
+    finally:
+        os.close(fd)
+
 
 class Instruction:
     """Представление инструкции машинного кода."""
@@ -23,12 +41,12 @@ class Instruction:
         """Конвертировать инструкцию в байты (little-endian, 32-bit)."""
         # Опкод в младших 8 битах, операнд в старших 24 битах
         word = (self.operand << 8) | self.opcode
-        return struct.pack('<I', word)
+        return _WORD.pack(word)
     
     @classmethod
     def from_bytes(cls, data: bytes) -> 'Instruction':
         """Создать инструкцию из байтов."""
-        word = struct.unpack('<I', data)[0]
+        word = _WORD.unpack(data)[0]
         opcode = word & 0xFF
         operand = (word >> 8) & 0xFFFFFF
         return cls(opcode, operand)
@@ -57,77 +75,116 @@ class MachineCode:
     
     def add_word(self, value: int) -> int:
         """Добавить 32-битное слово в память данных."""
-        return self.add_data(struct.pack('<I', value))
+        return self.add_data(_WORD.pack(value))
     
     def add_cstring(self, text: str) -> int:
         """Добавить C-строку (null-terminated) в память данных."""
         return self.add_data(text.encode('utf-8') + b'\0')
     
+    def serialize_instructions(self) -> bytes:
+        """Сериализовать память команд в один буфер.
+
+        pack_into в предразмеренный bytearray: одна аллокация вместо
+        bytes-объекта на каждую инструкцию.
+        """
+        buffer = bytearray(4 * len(self.instructions))
+        pack_into = _WORD.pack_into
+        offset = 0
+        for instr in self.instructions:
+            pack_into(buffer, offset, (instr.operand << 8) | instr.opcode)
+            offset += 4
+        return bytes(buffer)
+
+    def serialize_data(self) -> bytes:
+        """Сериализовать память данных в один буфер."""
+        return bytes(self.data_memory)
+
     def save_instruction_memory(self, file_path: str) -> None:
         """Save instruction memory to a binary file."""
-        path = Path(file_path)
-        with path.open('wb') as f:
-            for instr in self.instructions:
-                f.write(instr.to_bytes())
-    
+        # Одна физическая запись вместо записи по инструкции
+        _write_bytes(file_path, self.serialize_instructions())
+
     def save_data_memory(self, file_path: str) -> None:
         """Save data memory to a binary file."""
-        path = Path(file_path)
-        with path.open('wb') as f:
-            f.write(self.data_memory)
+        _write_bytes(file_path, self.serialize_data())
+
+    def save_all(self, base: str, *, debug: bool = False) -> None:
+        """Save all output files for the given base name in one call.
+
+        Память команд — {base}.bin, память данных — {base}_data.bin,
+        отладочный листинг (при debug) — {base}_debug.txt. Бинарные
+        буферы уходят через os.write без прослойки BufferedWriter.
+        """
+        _write_bytes(f"{base}.bin", self.serialize_instructions())
+        _write_bytes(f"{base}_data.bin", self.serialize_data())
+        if debug:
+            self.save_debug_listing(f"{base}_debug.txt")
     
     def save_debug_listing(self, file_path: str) -> None:
-        """Save debug listing to a text file."""
-        path = Path(file_path)
-        with path.open('w', encoding='utf-8') as f:
-            f.write("INSTRUCTION MEMORY:\n")
-            f.write("Address - Hex Code - Mnemonic\n")
-            f.write("-" * 40 + "\n")
-            
-            addr = 0
-            for _i, instr in enumerate(self.instructions):
-                hex_code = instr.to_bytes().hex().upper()
-                if instr.operand != 0:
-                    mnemonic = f"{get_opcode_name(instr.opcode)} {instr.operand}"
-                else:
-                    mnemonic = get_opcode_name(instr.opcode)
-                
-                f.write(f"{addr:04X} - {hex_code} - {mnemonic}\n")
-                addr += instr.size_in_words()
-            
-            f.write("\nDATA MEMORY:\n")
-            f.write("Address - Hex Dump - ASCII\n")
-            f.write("-" * 40 + "\n")
-            
-            # Dump data in 16-byte rows
-            for i in range(0, len(self.data_memory), 16):
-                chunk = self.data_memory[i:i+16]
-                hex_dump = ' '.join(f"{b:02X}" for b in chunk)
-                ascii_min = 32
-                ascii_max = 126
-                ascii_dump = ''.join(chr(b) if ascii_min <= b <= ascii_max else '.' for b in chunk)
-                f.write(f"{i:04X} - {hex_dump:<48} - {ascii_dump}\n")
+        """Save debug listing to a text file.
+
+        Строки копятся в списке и уходят одной записью: без прохода
+        через TextIOWrapper на каждую инструкцию и строку дампа.
+        """
+        lines = [
+            "INSTRUCTION MEMORY:\n",
+            "Address - Hex Code - Mnemonic\n",
+            "-" * 40 + "\n",
+        ]
+
+        addr = 0
+        for instr in self.instructions:
+            hex_code = instr.to_bytes().hex().upper()
+            if instr.operand != 0:
+                mnemonic = f"{get_opcode_name(instr.opcode)} {instr.operand}"
+            else:
+                mnemonic = get_opcode_name(instr.opcode)
+
+            lines.append(f"{addr:04X} - {hex_code} - {mnemonic}\n")
+            addr += instr.size_in_words()
+
+        lines.append("\nDATA MEMORY:\n")
+        lines.append("Address - Hex Dump - ASCII\n")
+        lines.append("-" * 40 + "\n")
+
+        # Dump data in 16-byte rows
+        ascii_min = 32
+        ascii_max = 126
+        for i in range(0, len(self.data_memory), 16):
+            chunk = self.data_memory[i:i+16]
+            hex_dump = ' '.join(f"{b:02X}" for b in chunk)
+            ascii_dump = ''.join(chr(b) if ascii_min <= b <= ascii_max else '.' for b in chunk)
+            lines.append(f"{i:04X} - {hex_dump:<48} - {ascii_dump}\n")
+
+        with Path(file_path).open('w', encoding='utf-8') as f:
+            f.write("".join(lines))
     
+    @classmethod
+    def load_instruction_memory_from_bytes(cls, buffer: bytes) -> List[Instruction]:
+        """Decode instruction memory from an in-memory buffer.
+
+        iter_unpack проходит буфер одним C-циклом; неполное хвостовое
+        слово игнорируется, как и при чтении файла по 4 байта.
+        """
+        whole_words = len(buffer) - (len(buffer) % 4)
+        return [
+            Instruction(word & 0xFF, (word >> 8) & 0xFFFFFF)
+            for (word,) in _WORD.iter_unpack(buffer[:whole_words])
+        ]
+
     @classmethod
     def load_instruction_memory(cls, file_path: str) -> List[Instruction]:
-        """Load instruction memory from a binary file."""
-        word_size = 4
-        instructions: List[Instruction] = []
-        path = Path(file_path)
-        with path.open('rb') as f:
-            while True:
-                data = f.read(word_size)
-                if len(data) < word_size:
-                    break
-                instructions.append(Instruction.from_bytes(data))
-        return instructions
+        """Load instruction memory from a binary file.
+
+        Файл читается целиком одним read вместо цикла по 4 байта:
+        последовательное чтение без промежуточной буферизации.
+        """
+        return cls.load_instruction_memory_from_bytes(Path(file_path).read_bytes())
     
     @classmethod
     def load_data_memory(cls, file_path: str) -> bytearray:
         """Load data memory from a binary file."""
-        path = Path(file_path)
-        with path.open('rb') as f:
-            return bytearray(f.read())
+        return bytearray(Path(file_path).read_bytes())
 
 
 def format_instruction_trace(pc: int, instruction: Instruction) -> str:
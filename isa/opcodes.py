@@ -48,10 +48,15 @@ class Opcode(IntEnum):
     LOAD_I = 0x52   # Load from instruction memory
     LOADB = 0x53    # Load byte from data memory
     STOREB = 0x54   # Store byte to data memory
+    LOAD_DIRECT = 0x55   # Load from data memory at immediate address
+    STORE_DIRECT = 0x56  # Store to data memory at immediate address
+    LOAD_ELEM = 0x57     # Load vector element: MEM[base + 4 + index*4]
+    STORE_ELEM = 0x58    # Store vector element: MEM[base + 4 + index*4]
     
     # I/O
     IN = 0x60       # Input from port
     OUT = 0x61      # Output to port
+    IN_READLINE_BUF = 0x62  # Read line from port into buffer (addr, maxLen from stack)
     
     # System
     HALT = 0x70     # Halt
@@ -106,6 +111,8 @@ INSTRUCTION_SIZES = {
     Opcode.LOAD_I: 1,
     Opcode.LOADB: 1,
     Opcode.STOREB: 1,
+    Opcode.LOAD_ELEM: 1,
+    Opcode.STORE_ELEM: 1,
     Opcode.RET: 1,
     Opcode.HALT: 1,
     Opcode.NOP: 1,
@@ -120,6 +127,9 @@ INSTRUCTION_SIZES = {
     Opcode.IN: 2,
     Opcode.OUT: 2,
     Opcode.INT: 2,
+    Opcode.LOAD_DIRECT: 2,
+    Opcode.STORE_DIRECT: 2,
+    Opcode.IN_READLINE_BUF: 2,
     
     # Vector instructions (with operands where applicable)
     Opcode.V_LOAD: 2,
@@ -175,8 +185,13 @@ INSTRUCTION_CYCLES = {
     Opcode.LOAD_I: 4,
     Opcode.LOADB: 4,
     Opcode.STOREB: 4,
+    Opcode.LOAD_DIRECT: 4,
+    Opcode.STORE_DIRECT: 4,
+    Opcode.LOAD_ELEM: 5,
+    Opcode.STORE_ELEM: 5,
     Opcode.IN: 5,
     Opcode.OUT: 5,
+    Opcode.IN_READLINE_BUF: 8,
     Opcode.HALT: 1,
     Opcode.INT: 8,
     Opcode.IRET: 6,
@@ -1,307 +1,427 @@
 """AST nodes for the Alg-like language."""
 
-from abc import ABC, abstractmethod
-from typing import Any, List
-from dataclasses import dataclass
+from __future__ import annotations
+
+import functools
+import sys
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import TYPE_CHECKING, ClassVar
+
+if TYPE_CHECKING:
+    from typing import Any
+
+
+class NodeKind(IntEnum):
+    """Целочисленный тег для каждого конкретного класса узла.
+
+    Чтение node.KIND — это загрузка атрибута класса по фиксированному
+    смещению, а диспетчеризация по нему — индексация плоского списка
+    обработчиков вместо словарного поиска по типу.
+    """
+
+    NUMBER_LITERAL = 0
+    STRING_LITERAL = 1
+    BOOLEAN_LITERAL = 2
+    NULL_LITERAL = 3
+    IDENTIFIER = 4
+    BINARY_OPERATION = 5
+    UNARY_OPERATION = 6
+    FUNCTION_CALL = 7
+    VECTOR_LITERAL = 8
+    ARRAY_ACCESS = 9
+    EXPRESSION_STATEMENT = 10
+    VAR_DECLARATION = 11
+    ASSIGNMENT = 12
+    BLOCK = 13
+    IF_STATEMENT = 14
+    WHILE_STATEMENT = 15
+    FOR_STATEMENT = 16
+    FUNCTION_DECLARATION = 17
+    RETURN_STATEMENT = 18
+    PROGRAM = 19
+
+
+# Интернирование операторов: строка оператора отображается в малый int
+# один раз при построении узла, чтобы задние проходы диспетчеризовались
+# индексацией кортежа вместо хеширования строки на каждый визит.
+BINARY_OP_IDS = {
+    '+': 0, '-': 1, '*': 2, '/': 3, '%': 4,
+    '==': 5, '!=': 6, '<': 7, '<=': 8, '>': 9, '>=': 10,
+    '&&': 11, 'and': 11, '||': 12, 'or': 12,
+}
+UNARY_OP_IDS = {'-': 0, '!': 1, 'not': 1}
+
+
+class ASTNode:
+    """Базовый класс для всех узлов AST.
+
+    Обычный класс вместо ABC: узлы создаются в горячем пути парсера,
+    и ABCMeta заметно удорожает их конструирование и isinstance-проверки.
+
+    __slots__ = () по всей иерархии: конкретные узлы объявлены как
+    dataclass(slots=True), и пустые слоты в базовых классах не дают
+    экземплярам получить __dict__ — узел занимает только свои поля.
+    """
+
+    __slots__ = ()
+
+    def accept(self, visitor: ASTVisitor) -> Any:
+        """Паттерн посетитель для обхода AST (обёртка над ASTVisitor.visit)."""
+        return visitor.visit(self)
 
 
-class ASTNode(ABC):
-    """Базовый класс для всех узлов AST."""
-    
-    @abstractmethod
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        """Паттерн посетитель для обхода AST."""
-        pass
+class Expression(ASTNode):
+    """Базовый класс для выражений.
 
+    Конкретные выражения — замороженные dataclass'ы: они логически
+    неизменяемы, а автоматический __hash__ позволяет интернировать
+    повторяющиеся поддеревья и мемоизировать проходы по ним.
+    """
 
-class Expression(ASTNode):
-    """Базовый класс для выражений."""
-    pass
+    __slots__ = ()
 
 
 class Statement(ASTNode):
     """Базовый класс для операторов."""
-    pass
+
+    __slots__ = ()
 
 
 # Выражения
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NumberLiteral(Expression):
     """Numeric literal."""
+    KIND: ClassVar[int] = NodeKind.NUMBER_LITERAL
     value: int | float
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_number_literal(self)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StringLiteral(Expression):
     """String literal."""
+    KIND: ClassVar[int] = NodeKind.STRING_LITERAL
     value: str
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_string_literal(self)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BooleanLiteral(Expression):
     """Boolean literal."""
+    KIND: ClassVar[int] = NodeKind.BOOLEAN_LITERAL
     value: bool
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_boolean_literal(self)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NullLiteral(Expression):
     """Null literal."""
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_null_literal(self)
+    KIND: ClassVar[int] = NodeKind.NULL_LITERAL
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Identifier(Expression):
     """Variable identifier."""
+    KIND: ClassVar[int] = NodeKind.IDENTIFIER
     name: str
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_identifier(self)
 
+    # Инлайн-кэш разрешения имени: пара (generation, var_info),
+    # заполняется генератором кода через object.__setattr__.
+    # compare=False/repr=False — не участвует в __eq__/__hash__/__repr__;
+    # объявлено полем, чтобы при slots=True кэш получил собственный слот.
+    _resolved: Any = field(default=None, init=False, repr=False, compare=False)
+
+    def cached_resolution(self) -> Any:
+        """Прочитать инлайн-кэш разрешения (None — ещё не заполнен)."""
+        return self._resolved
 
-@dataclass
+    def cache_resolution(self, entry: Any) -> None:
+        """Записать инлайн-кэш разрешения в обход frozen-атрибутов."""
+        object.__setattr__(self, '_resolved', entry)
+
+    @classmethod
+    @functools.cache
+    def get(cls, name: str) -> Identifier:
+        """Вернуть разделяемый узел-приспособленец для данного имени.
+
+        Одни и те же имена встречаются в программе тысячи раз; кэш
+        по интернированному имени даёт один объект на имя, так что
+        сравнение идентификаторов сводится к сравнению ссылок.
+
+        Лексер уже интернирует лексемы идентификаторов, поэтому для имён
+        из разбора sys.intern здесь — дешёвый no-op; он оставлен ради
+        узлов, построенных программно (понижение, тесты).
+        """
+        return cls(sys.intern(name))
+
+
+@dataclass(frozen=True, slots=True)
 class BinaryOperation(Expression):
     """Binary operation."""
+    KIND: ClassVar[int] = NodeKind.BINARY_OPERATION
     left: Expression
     operator: str
     right: Expression
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_binary_operation(self)
+    # Малый целочисленный id оператора (см. BINARY_OP_IDS); -1 для узлов,
+    # построенных в обход парсера — тогда генератор кода смотрит по строке
+    op_id: int = -1
+
+    # Мемоизация константной свёртки (заполняется генератором кода);
+    # слот-поле вне __eq__/__hash__/__repr__, см. Identifier._resolved
+    _folded: Any = field(default=None, init=False, repr=False, compare=False)
+
+    def cached_fold(self) -> Any:
+        """Прочитать мемоизированную свёртку (None — ещё не считалась)."""
+        return self._folded
 
+    def cache_fold(self, value: Any) -> None:
+        """Записать результат свёртки в обход frozen-атрибутов."""
+        object.__setattr__(self, '_folded', value)
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class UnaryOperation(Expression):
     """Unary operation."""
+    KIND: ClassVar[int] = NodeKind.UNARY_OPERATION
     operator: str
     operand: Expression
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_unary_operation(self)
+    op_id: int = -1
 
+    _folded: Any = field(default=None, init=False, repr=False, compare=False)
 
-@dataclass
+    def cached_fold(self) -> Any:
+        """Прочитать мемоизированную свёртку (None — ещё не считалась)."""
+        return self._folded
+
+    def cache_fold(self, value: Any) -> None:
+        """Записать результат свёртки в обход frozen-атрибутов."""
+        object.__setattr__(self, '_folded', value)
+
+
+@dataclass(frozen=True, slots=True)
 class FunctionCall(Expression):
     """Function call."""
+    KIND: ClassVar[int] = NodeKind.FUNCTION_CALL
     name: str
-    arguments: List[Expression]
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_function_call(self)
+    arguments: list[Expression]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class VectorLiteral(Expression):
     """Vector literal like <| 1, 2, 3, 4 |>."""
-    elements: List[Expression]
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_vector_literal(self)
+    KIND: ClassVar[int] = NodeKind.VECTOR_LITERAL
+    elements: list[Expression]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ArrayAccess(Expression):
     """Array element access."""
+    KIND: ClassVar[int] = NodeKind.ARRAY_ACCESS
     array: Expression
     index: Expression
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_array_access(self)
 
 
 # Операторы
-@dataclass
+@dataclass(slots=True)
 class ExpressionStatement(Statement):
     """Expression used as a statement."""
+    KIND: ClassVar[int] = NodeKind.EXPRESSION_STATEMENT
     expression: Expression
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_expression_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class VarDeclaration(Statement):
     """Variable declaration."""
+    KIND: ClassVar[int] = NodeKind.VAR_DECLARATION
     name: str
     initializer: Expression | None = None
     is_const: bool = False
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_var_declaration(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Assignment(Statement):
     """Assignment."""
+    KIND: ClassVar[int] = NodeKind.ASSIGNMENT
     target: Identifier
     value: Expression
     operator: str = "="  # =, +=, -=
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_assignment(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Block(Statement):
     """Block of statements."""
-    statements: List[Statement]
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_block(self)
+    KIND: ClassVar[int] = NodeKind.BLOCK
+    statements: list[Statement]
 
 
-@dataclass
+@dataclass(slots=True)
 class IfStatement(Statement):
     """If statement."""
+    KIND: ClassVar[int] = NodeKind.IF_STATEMENT
     condition: Expression
     then_stmt: Statement
     else_stmt: Statement | None = None
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_if_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class WhileStatement(Statement):
     """While loop."""
+    KIND: ClassVar[int] = NodeKind.WHILE_STATEMENT
     condition: Expression
     body: Statement
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_while_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class ForStatement(Statement):
     """For loop."""
+    KIND: ClassVar[int] = NodeKind.FOR_STATEMENT
     init: Statement | None
     condition: Expression | None
     update: Expression | None
     body: Statement
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_for_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionDeclaration(Statement):
     """Function declaration."""
+    KIND: ClassVar[int] = NodeKind.FUNCTION_DECLARATION
     name: str
-    parameters: List[str]
+    parameters: list[str]
     body: Block
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_function_declaration(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class ReturnStatement(Statement):
     """Return statement."""
+    KIND: ClassVar[int] = NodeKind.RETURN_STATEMENT
     value: Expression | None = None
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_return_statement(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Program(ASTNode):
     """Program root node."""
-    statements: List[Statement]
-    
-    def accept(self, visitor: 'ASTVisitor') -> Any:
-        return visitor.visit_program(self)
+    KIND: ClassVar[int] = NodeKind.PROGRAM
+    statements: list[Statement]
 
 
-# Абстрактный класс посетителя
-class ASTVisitor(ABC):
+# Базовый класс посетителя
+class ASTVisitor:
     """Visitor interface to traverse AST."""
-    
-    @abstractmethod
+
+    _HANDLER_NAMES = (
+        'visit_number_literal',
+        'visit_string_literal',
+        'visit_boolean_literal',
+        'visit_null_literal',
+        'visit_identifier',
+        'visit_binary_operation',
+        'visit_unary_operation',
+        'visit_function_call',
+        'visit_vector_literal',
+        'visit_array_access',
+        'visit_expression_statement',
+        'visit_var_declaration',
+        'visit_assignment',
+        'visit_block',
+        'visit_if_statement',
+        'visit_while_statement',
+        'visit_for_statement',
+        'visit_function_declaration',
+        'visit_return_statement',
+        'visit_program',
+    )
+
+    def __init__(self) -> None:
+        # Кэш связанных методов, проиндексированный NodeKind: getattr и
+        # протокол дескрипторов отрабатывают один раз на экземпляр
+        # посетителя, но не на каждый посещённый узел.
+        self._handlers = [getattr(self, name) for name in self._HANDLER_NAMES]
+
+    def visit(self, node: ASTNode) -> Any:
+        """Единая точка диспетчеризации по типу узла.
+
+        Каждый узел несёт целочисленный тег KIND (см. NodeKind), поэтому
+        выбор обработчика — индексация плоского списка связанных методов
+        вместо цепочки isinstance или словарного поиска по type(node).
+        """
+        kind = getattr(node, 'KIND', None)
+        if kind is None:
+            raise NotImplementedError(f"Unknown AST node: {type(node).__name__}")
+        return self._handlers[kind](node)
+
     def visit_number_literal(self, node: NumberLiteral) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_string_literal(self, node: StringLiteral) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_boolean_literal(self, node: BooleanLiteral) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_null_literal(self, node: NullLiteral) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_identifier(self, node: Identifier) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_binary_operation(self, node: BinaryOperation) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_unary_operation(self, node: UnaryOperation) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_function_call(self, node: FunctionCall) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_vector_literal(self, node: VectorLiteral) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_array_access(self, node: ArrayAccess) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_expression_statement(self, node: ExpressionStatement) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_var_declaration(self, node: VarDeclaration) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_assignment(self, node: Assignment) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_block(self, node: Block) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_if_statement(self, node: IfStatement) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_while_statement(self, node: WhileStatement) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_for_statement(self, node: ForStatement) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_function_declaration(self, node: FunctionDeclaration) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_return_statement(self, node: ReturnStatement) -> Any:
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def visit_program(self, node: Program) -> Any:
-        pass
\ No newline at end of file
+        raise NotImplementedError
+
+def lower_for(node: ForStatement) -> Block:
+    """Понизить цикл for в эквивалентный Block с WhileStatement.
+
+    for (init; cond; update) body  =>  { init; while (cond) { body; update; } }
+
+    Обёртка в Block сохраняет область видимости переменной из init,
+    а отсутствующее условие заменяется константой true. После понижения
+    задним проходам достаточно уметь обрабатывать только while-циклы.
+    """
+    body_stmts: list[Statement] = [node.body]
+    if node.update is not None:
+        body_stmts.append(ExpressionStatement(node.update))
+    condition = node.condition if node.condition is not None else BooleanLiteral(value=True)
+    loop = WhileStatement(condition, Block(body_stmts))
+    stmts: list[Statement] = []
+    if node.init is not None:
+        stmts.append(node.init)
+    stmts.append(loop)
+    return Block(stmts)
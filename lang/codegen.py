@@ -1,6 +1,7 @@
 """Генератор кода для стековой архитектуры с векторными расширениями."""
 
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any
+import itertools
 import struct
 
 from .ast_nodes import (
@@ -26,65 +27,332 @@ from .ast_nodes import (
     NumberLiteral,
     StringLiteral,
     VectorLiteral,
+    lower_for,
 )
 from isa.opcodes import Opcode
-from isa.machine_code import MachineCode
+from isa.machine_code import Instruction, MachineCode
+
+# NumPy необязателен: при наличии пакета крупные однородные векторные
+# литералы пакуются одной C-итерацией вместо поэлементного цикла
+try:
+    import numpy as np  # type: ignore[import-not-found]
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+# Предразобранные форматы struct для горячих путей
+_PACK_F = struct.Struct('<f').pack
+_PACK_I = struct.Struct('<I').pack
+
+# Порог, начиная от которого векторный литерал выгодно паковать через NumPy
+_NUMPY_VECTOR_MIN = 64
 
 # Argument count constants (to avoid magic numbers in checks)
 ARGS_2 = 2
 ARGS_3 = 3
 
+# Отображение бинарных операторов на опкоды; константа уровня модуля,
+# чтобы не строить словарь заново на каждую посещённую операцию
+BINARY_OP_MAP = {
+    '+': Opcode.ADD,
+    '-': Opcode.SUB,
+    '*': Opcode.MUL,
+    '/': Opcode.DIV,
+    '%': Opcode.MOD,
+    '==': Opcode.EQ,
+    '!=': Opcode.NE,
+    '<': Opcode.LT,
+    '<=': Opcode.LE,
+    '>': Opcode.GT,
+    '>=': Opcode.GE,
+    '&&': Opcode.AND,
+    '||': Opcode.OR,
+    'and': Opcode.AND,
+    'or': Opcode.OR,
+}
+
+# Эти же операции, проиндексированные интернированным op_id узла
+# (порядок повторяет ast_nodes.BINARY_OP_IDS / UNARY_OP_IDS)
+BINARY_OP_TABLE = (
+    Opcode.ADD, Opcode.SUB, Opcode.MUL, Opcode.DIV, Opcode.MOD,
+    Opcode.EQ, Opcode.NE, Opcode.LT, Opcode.LE, Opcode.GT, Opcode.GE,
+    Opcode.AND, Opcode.OR,
+)
+UNARY_OP_TABLE = (Opcode.NEG, Opcode.NOT)
+
+# Инструкции, операнд которых — адрес в памяти команд
+_BRANCH_OPS = frozenset((int(Opcode.JMP), int(Opcode.JZ), int(Opcode.JNZ), int(Opcode.CALL)))
+
+# Константная свёртка: операции в точности повторяют семантику процессора
+# (32-битная беззнаковая арифметика, битовые NOT/AND/OR, сравнения в 0/1)
+_MASK32 = 0xFFFFFFFF
+# Предел операнда инструкции: 24 бита (см. isa.machine_code.Instruction)
+_OPERAND_MAX = 0xFFFFFF
+_FOLD_BINARY: Dict[str, Callable[[int, int], int | None]] = {
+    '+': lambda a, b: (a + b) & _MASK32,
+    '-': lambda a, b: (a - b) & _MASK32,
+    '*': lambda a, b: (a * b) & _MASK32,
+    '/': lambda a, b: (a // b) & _MASK32 if b != 0 else None,
+    '%': lambda a, b: (a % b) & _MASK32 if b != 0 else None,
+    '==': lambda a, b: 1 if a == b else 0,
+    '!=': lambda a, b: 1 if a != b else 0,
+    '<': lambda a, b: 1 if a < b else 0,
+    '<=': lambda a, b: 1 if a <= b else 0,
+    '>': lambda a, b: 1 if a > b else 0,
+    '>=': lambda a, b: 1 if a >= b else 0,
+    # Логические операции повторяют эмитируемую последовательность:
+    # каждый операнд приводится к 0/1 (PUSH 0; NE), затем битовые AND/OR —
+    # в том числе для небулевых значений вроде результата битового '!'
+    '&&': lambda a, b: (1 if a != 0 else 0) & (1 if b != 0 else 0),
+    'and': lambda a, b: (1 if a != 0 else 0) & (1 if b != 0 else 0),
+    '||': lambda a, b: (1 if a != 0 else 0) | (1 if b != 0 else 0),
+    'or': lambda a, b: (1 if a != 0 else 0) | (1 if b != 0 else 0),
+}
+_FOLD_UNARY: Dict[str, Callable[[int], int]] = {
+    '-': lambda a: (-a) & _MASK32,
+    # '!' эмитируется как Opcode.NOT — битовое ~ по 32-битной маске,
+    # свёртка обязана давать тот же результат, но не логические 0/1
+    '!': lambda a: (~a) & _MASK32,
+    'not': lambda a: (~a) & _MASK32,
+}
+# Маркер "узел уже пробовали свернуть, не складывается"
+_NO_FOLD = object()
+
+# Векторные возможности целевого процессора по умолчанию (полный набор)
+DEFAULT_VECTOR_FEATURES = frozenset(
+    name for name in Opcode.__members__ if name.startswith('V_')
+)
+
+# Табличные описания простых builtin-ов:
+# имя -> (число аргументов, порядок выкладки на стек, хвостовые
+# инструкции (опкод, операнд), требуемая векторная возможность).
+# Сложные builtin-ы (readLine, alloc) остаются методами генератора.
+_BUILTIN_SPECS = {
+    'print': (1, (0,), ((Opcode.OUT, 1),), None),
+    'print_number': (1, (0,), ((Opcode.OUT, 0),), None),
+    'read': (0, (), ((Opcode.IN, 0),), None),
+    'readInt': (0, (), ((Opcode.IN, 0),), None),
+    'readLineBuf': (2, (0, 1), ((Opcode.IN_READLINE_BUF, 0),), None),
+    'len': (1, (0,), ((Opcode.LOAD, 0),), None),
+    'chr': (1, (0,), (), None),
+    'putc': (1, (0,), ((Opcode.OUT, 2),), None),
+    'v_load': (3, (0, 1, 2), ((Opcode.V_LOAD, 0),), Opcode.V_LOAD),
+    'v_add': (3, (0, 1, 2), ((Opcode.V_ADD, 0),), Opcode.V_ADD),
+    'v_dot': (2, (0, 1), ((Opcode.V_DOT, 0),), Opcode.V_DOT),
+    'v_store': (2, (1, 0), ((Opcode.V_STORE, 0),), Opcode.V_STORE),
+    'v_sum': (1, (0,), ((Opcode.V_SUM, 0),), Opcode.V_SUM),
+    'set_interrupt_handler': (2, (0, 1), ((Opcode.INT, 0x80),), None),
+    'enable_interrupts': (0, (), ((Opcode.INT, 0x81),), None),
+    'disable_interrupts': (0, (), ((Opcode.INT, 0x82),), None),
+}
+
 
 class CodeGenError(Exception):
     """Ошибка генерации кода."""
     pass
 
 
+# Маркер "имя не было связано во внешней области" для undo-записей
+_UNBOUND = object()
+
+# Источник поколений для всех таблиц символов процесса (см.
+# SymbolTable.generation и CodeGenerator._resolve)
+_GENERATIONS = itertools.count(1)
+
+
 class SymbolTable:
-    """Таблица символов для переменных и функций."""
+    """Таблица символов для переменных и функций.
+
+    Видимые связывания лежат в одном плоском словаре current, так что
+    get/exists — одна хеш-операция независимо от глубины вложенности.
+    Вместо стека словарей хранится стек undo-списков: define записывает
+    прежнее значение имени, а exit_scope откатывает записи своего уровня.
+    """
     
     def __init__(self) -> None:
-        self.scopes: List[Dict[str, Any]] = [{}]  # Стек областей видимости
+        self.current: Dict[str, Any] = {}  # Видимые связывания одним словарём
+        self.undo_stack: List[List[Any]] = [[]]  # Откат по областям видимости
         self.functions: Dict[str, int] = {}  # Функции -> адрес
         self.strings: Dict[str, int] = {}   # Строки -> адрес в памяти данных
-        self.next_temp_id = 0
-    
+        self.vectors: Dict[bytes, int] = {}  # Векторные блобы -> адрес
+        self.temps: List[Any] = []  # Значения временных слотов по int id
+        # Поколение таблицы: меняется при каждом изменении структуры
+        # областей видимости и инвалидирует инлайн-кэши на узлах
+        # Identifier. Значения берутся из глобального монотонного
+        # счётчика: узлы разделяются между вызовами generate_code, и
+        # поколения разных таблиц не должны пересекаться — иначе кэш
+        # прошлой программы мог бы пройти проверку в новой
+        self.generation = next(_GENERATIONS)
+
     def enter_scope(self) -> None:
         """Войти в новую область видимости."""
-        self.scopes.append({})
+        self.undo_stack.append([])
+        self.generation = next(_GENERATIONS)
     
     def exit_scope(self) -> None:
-        """Выйти из области видимости."""
-        if len(self.scopes) > 1:
-            self.scopes.pop()
+        """Выйти из области видимости, откатив её связывания."""
+        if len(self.undo_stack) > 1:
+            current = self.current
+            for name, prev in reversed(self.undo_stack.pop()):
+                if prev is _UNBOUND:
+                    del current[name]
+                else:
+                    current[name] = prev
+        self.generation = next(_GENERATIONS)
     
     def define(self, name: str, value: Any) -> None:
         """Определить переменную в текущей области видимости."""
-        self.scopes[-1][name] = value
+        self.undo_stack[-1].append((name, self.current.get(name, _UNBOUND)))
+        self.current[name] = value
+        self.generation = next(_GENERATIONS)
     
     def get(self, name: str) -> Any:
         """Получить переменную."""
-        for scope in reversed(self.scopes):
-            if name in scope:
-                return scope[name]
-        raise CodeGenError(f"Неопределенная переменная: {name}")
+        try:
+            return self.current[name]
+        except KeyError:
+            raise CodeGenError(f"Неопределенная переменная: {name}") from None
     
     def exists(self, name: str) -> bool:
         """Проверить, существует ли переменная."""
-        return any(name in scope for scope in reversed(self.scopes))
+        return name in self.current
     
-    def get_temp_var(self) -> str:
-        """Получить имя временной переменной."""
-        name = f"__temp_{self.next_temp_id}"
-        self.next_temp_id += 1
-        return name
+    def get_temp(self) -> int:
+        """Выделить временный слот и вернуть его целочисленный id.
+
+        Временные значения видит только генератор кода, поэтому строковые
+        имена вида __temp_N (с аллокацией и хешированием строки на каждый
+        временный слот) заменены индексом в списке temps.
+        """
+        self.temps.append(None)
+        return len(self.temps) - 1
+    
+    def set_temp(self, temp_id: int, value: Any) -> None:
+        """Записать значение временного слота."""
+        self.temps[temp_id] = value
+    
+    def get_temp_value(self, temp_id: int) -> Any:
+        """Прочитать значение временного слота."""
+        return self.temps[temp_id]
+
+
+class _PreScan(ASTVisitor):
+    """Предварительный проход перед генерацией кода.
+
+    Собирает все строковые литералы программы, чтобы основной проход
+    интернировал их одним пакетом до начала эмиссии: _get_string_address
+    в горячем пути становится чистым поиском в словаре. Предварительное
+    резервирование списка инструкций (как предлагает классическая
+    оптимизация) в CPython невыразимо — у list нет reserve, а рост
+    амортизирован, поэтому ограничиваемся интернированием.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.strings: List[str] = []
+        self._seen: set = set()
+
+    def visit_number_literal(self, node: NumberLiteral) -> Any:
+        pass
+
+    def visit_string_literal(self, node: StringLiteral) -> Any:
+        if node.value not in self._seen:
+            self._seen.add(node.value)
+            self.strings.append(node.value)
+
+    def visit_boolean_literal(self, node: BooleanLiteral) -> Any:
+        pass
+
+    def visit_null_literal(self, node: NullLiteral) -> Any:
+        pass
+
+    def visit_identifier(self, node: Identifier) -> Any:
+        pass
+
+    def visit_binary_operation(self, node: BinaryOperation) -> Any:
+        node.left.accept(self)
+        node.right.accept(self)
+
+    def visit_unary_operation(self, node: UnaryOperation) -> Any:
+        node.operand.accept(self)
+
+    def visit_function_call(self, node: FunctionCall) -> Any:
+        for argument in node.arguments:
+            argument.accept(self)
+
+    def visit_vector_literal(self, node: VectorLiteral) -> Any:
+        pass
+
+    def visit_array_access(self, node: ArrayAccess) -> Any:
+        node.array.accept(self)
+        node.index.accept(self)
+
+    def visit_expression_statement(self, node: ExpressionStatement) -> Any:
+        node.expression.accept(self)
+
+    def visit_var_declaration(self, node: VarDeclaration) -> Any:
+        if node.initializer is not None:
+            node.initializer.accept(self)
+
+    def visit_assignment(self, node: Assignment) -> Any:
+        node.value.accept(self)
+
+    def visit_block(self, node: Block) -> Any:
+        for statement in node.statements:
+            statement.accept(self)
+
+    def visit_if_statement(self, node: IfStatement) -> Any:
+        node.condition.accept(self)
+        node.then_stmt.accept(self)
+        if node.else_stmt is not None:
+            node.else_stmt.accept(self)
+
+    def visit_while_statement(self, node: WhileStatement) -> Any:
+        node.condition.accept(self)
+        node.body.accept(self)
+
+    def visit_for_statement(self, node: ForStatement) -> Any:
+        if node.init is not None:
+            node.init.accept(self)
+        if node.condition is not None:
+            node.condition.accept(self)
+        if node.update is not None:
+            node.update.accept(self)
+        node.body.accept(self)
+
+    def visit_function_declaration(self, node: FunctionDeclaration) -> Any:
+        node.body.accept(self)
+
+    def visit_return_statement(self, node: ReturnStatement) -> Any:
+        if node.value is not None:
+            node.value.accept(self)
+
+    def visit_program(self, node: Program) -> Any:
+        for statement in node.statements:
+            statement.accept(self)
 
 
 class CodeGenerator(ASTVisitor):
     """Генератор кода для стековой архитектуры."""
     
-    def __init__(self) -> None:
+    def __init__(self, target_features: 'frozenset[str]' = DEFAULT_VECTOR_FEATURES) -> None:
+        super().__init__()
+        # Поддерживаемые целевым процессором векторные опкоды: эмиссия
+        # недоступной V_*-инструкции — ошибка трансляции, но не падение
+        # на неизвестной инструкции во время выполнения
+        self.target_features = target_features
         self.machine_code = MachineCode()
+        # Связанные методы аллокации в памяти данных: MachineCode уже
+        # копит данные в одном непрерывном bytearray по абсолютным
+        # смещениям, так что кэшируем только поиск атрибутов
+        self._add_data = self.machine_code.add_data
+        self._add_word = self.machine_code.add_word
+        self._add_cstring = self.machine_code.add_cstring
+        # Буферы инструкций: пары (опкод, операнд) как плоские списки int
+        self._ops: List[int] = []
+        self._operands: List[int] = []
+        # Индексы PUSH-инструкций, операнд которых — адрес в памяти команд
+        # (адреса функций); peephole-проход обязан их переадресовать
+        self._code_addr_pushes: set = set()
         self.symbols = SymbolTable()
         self.current_address = 0
         self.loop_stack: List[Dict[str, int]] = []  # Для break/continue
@@ -94,54 +362,188 @@ class CodeGenerator(ASTVisitor):
         self.INPUT_PORT = 0
         self.OUTPUT_PORT = 1
         
-        # Встроенные функции
+        # Встроенные функции, не укладывающиеся в табличную эмиссию
         self.builtin_functions = {
-            'print': self._generate_print,
-            'print_number': self._generate_print_number,
             'readLine': self._generate_read_line,
             'alloc': self._generate_alloc,
-            'readLineBuf': self._generate_read_line_buf,
-            'read': self._generate_read,
-            'readInt': self._generate_read_int,
-            'len': self._generate_len,
-            'chr': self._generate_chr,
-            'putc': self._generate_putc,
-            'v_load': self._generate_v_load,
-            'v_add': self._generate_v_add,
-            'v_dot': self._generate_v_dot,
-            'v_store': self._generate_v_store,
-            'v_sum': self._generate_v_sum,
-            'set_interrupt_handler': self._generate_set_interrupt_handler,
-            'enable_interrupts': self._generate_enable_interrupts,
-            'disable_interrupts': self._generate_disable_interrupts,
         }
     
     def generate(self, program: Program) -> MachineCode:
         """Главная функция генерации кода."""
+        # Предварительный проход: интернируем все строки до эмиссии
+        prescan = _PreScan()
+        program.accept(prescan)
+        strings = self.symbols.strings
+        add_cstring = self._add_cstring
+        for text in prescan.strings:
+            if text not in strings:
+                strings[text] = add_cstring(text)
+        
         # Генерируем код программы
         program.accept(self)
         
         # Добавляем halt в конец программы
         self._emit(Opcode.HALT)
         
+        # Peephole-оптимизация по готовому потоку инструкций
+        self._peephole()
+        
+        # Инструкции накапливаются в двух плоских списках int (см. _emit);
+        # объекты Instruction материализуются одним проходом в конце,
+        # вместо аллокации по объекту на каждый вызов _emit.
+        self.machine_code.instructions = [
+            Instruction(opcode, operand)
+            for opcode, operand in zip(self._ops, self._operands, strict=True)
+        ]
         return self.machine_code
     
 
     
     def _emit(self, opcode: int, operand: int = 0) -> int:
         """Генерировать инструкцию и вернуть её адрес."""
-        address = len(self.machine_code.instructions)
-        self.machine_code.add_instruction(opcode, operand)
+        address = len(self._ops)
+        self._ops.append(opcode)
+        self._operands.append(operand)
         return address
     
     def _patch_address(self, instruction_addr: int, target_addr: int) -> None:
         """Исправить адрес в инструкции."""
-        self.machine_code.instructions[instruction_addr].operand = target_addr
+        self._operands[instruction_addr] = target_addr
+    
+    def _peephole(self) -> None:
+        """Слить пары PUSH addr; LOAD/STORE в LOAD_DIRECT/STORE_DIRECT.
+
+        Почти каждый доступ к переменной стоит двух инструкций; слияние
+        сокращает и размер кода, и число диспетчеризаций процессора.
+        Переходы (JMP/JZ/JNZ/CALL) и PUSH-и адресов функций переадресуются
+        по таблице соответствия старых и новых индексов; пара не сливается,
+        если её вторая инструкция сама является целью перехода.
+        """
+        ops, operands = self._ops, self._operands
+        n = len(ops)
+        branch_ops = _BRANCH_OPS
+        
+        # Индексы, на которые можно попасть переходом
+        targets = {operands[i] for i in range(n) if ops[i] in branch_ops}
+        targets.update(operands[i] for i in self._code_addr_pushes)
+        
+        push = int(Opcode.PUSH)
+        load = int(Opcode.LOAD)
+        store = int(Opcode.STORE)
+        new_ops: List[int] = []
+        new_operands: List[int] = []
+        old_to_new = [0] * (n + 1)
+        new_code_pushes = []
+        i = 0
+        while i < n:
+            new_index = len(new_ops)
+            old_to_new[i] = new_index
+            op = ops[i]
+            if (op == push and i + 1 < n and i + 1 not in targets
+                    and i not in self._code_addr_pushes):
+                nxt = ops[i + 1]
+                if nxt in (load, store):
+                    new_ops.append(int(Opcode.LOAD_DIRECT) if nxt == load
+                                   else int(Opcode.STORE_DIRECT))
+                    new_operands.append(operands[i])
+                    old_to_new[i + 1] = new_index
+                    i += 2
+                    continue
+            if i in self._code_addr_pushes:
+                new_code_pushes.append(new_index)
+            new_ops.append(op)
+            new_operands.append(operands[i])
+            i += 1
+        old_to_new[n] = len(new_ops)
+        
+        # Переадресация переходов и PUSH-ей адресов функций
+        for j, op in enumerate(new_ops):
+            if op in branch_ops:
+                new_operands[j] = old_to_new[new_operands[j]]
+        for j in new_code_pushes:
+            new_operands[j] = old_to_new[new_operands[j]]
+        
+        self._ops = new_ops
+        self._operands = new_operands
+        self._code_addr_pushes = set(new_code_pushes)
+    
+    def _try_fold(self, node: Expression) -> Any:
+        """Свернуть чисто литеральное поддерево в одно значение int.
+
+        Возвращает None, если свёртка невозможна. Результат мемоизируется
+        на самих узлах (поддеревья разделяются интернированием, так что
+        кэш переживает повторные употребления выражения).
+        """
+        if isinstance(node, NumberLiteral):
+            literal = node.value
+            if isinstance(literal, int) and not isinstance(literal, bool):
+                return literal & _MASK32
+            return None
+        if isinstance(node, BooleanLiteral):
+            return 1 if node.value else 0
+        if isinstance(node, BinaryOperation):
+            cached = node.cached_fold()
+            if cached is not None:
+                return None if cached is _NO_FOLD else cached
+            value: int | None = None
+            binary_fold = _FOLD_BINARY.get(node.operator)
+            if binary_fold is not None:
+                left = self._try_fold(node.left)
+                if left is not None:
+                    right = self._try_fold(node.right)
+                    if right is not None:
+                        value = binary_fold(left, right)
+            node.cache_fold(_NO_FOLD if value is None else value)
+            return value
+        if isinstance(node, UnaryOperation):
+            cached = node.cached_fold()
+            if cached is not None:
+                return None if cached is _NO_FOLD else cached
+            value = None
+            unary_fold = _FOLD_UNARY.get(node.operator)
+            if unary_fold is not None:
+                operand = self._try_fold(node.operand)
+                if operand is not None:
+                    value = unary_fold(operand)
+            node.cache_fold(_NO_FOLD if value is None else value)
+            return value
+        return None
+
+    def _emit_folded(self, value: int) -> bool:
+        """Выдать PUSH для свёрнутого значения, если оно влезает в операнд."""
+        if 0 <= value <= _OPERAND_MAX:
+            self._emit(Opcode.PUSH, value)
+            return True
+        return False
+    
+    def _require_feature(self, opcode: Opcode, builtin: str) -> None:
+        """Проверить, что целевой процессор поддерживает векторный опкод."""
+        if opcode.name not in self.target_features:
+            raise CodeGenError(
+                f"{builtin}: целевой процессор не поддерживает {opcode.name}",
+            )
+    
+    def _resolve(self, node: Identifier) -> Any:
+        """Разрешить идентификатор с инлайн-кэшем на самом узле.
+
+        Identifier — разделяемый приспособленец, поэтому кэш хранится
+        парой (generation, var_info) и действителен, только пока таблица
+        символов не менялась (см. SymbolTable.generation).
+        """
+        generation = self.symbols.generation
+        cached = node.cached_resolution()
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        if not self.symbols.exists(node.name):
+            raise CodeGenError(f"Неопределенная переменная: {node.name}")
+        var_info = self.symbols.get(node.name)
+        node.cache_resolution((generation, var_info))
+        return var_info
     
     def _get_string_address(self, text: str) -> int:
         """Получить адрес строки в памяти данных."""
         if text not in self.symbols.strings:
-            self.symbols.strings[text] = self.machine_code.add_cstring(text)
+            self.symbols.strings[text] = self._add_cstring(text)
         return self.symbols.strings[text]
     
     # Методы посетителя
@@ -154,7 +556,7 @@ class CodeGenerator(ASTVisitor):
         """Посетить числовой литерал."""
         if isinstance(node.value, float):
             # Для float сохраняем в памяти данных
-            addr = self.machine_code.add_data(struct.pack('<f', node.value))
+            addr = self._add_data(_PACK_F(node.value))
             self._emit(Opcode.PUSH, addr)
             self._emit(Opcode.LOAD)
         else:
@@ -178,13 +580,10 @@ class CodeGenerator(ASTVisitor):
         """Посетить идентификатор."""
         # Сначала проверяем, не является ли это именем функции (для передачи адреса функции)
         if node.name in self.symbols.functions:
-            self._emit(Opcode.PUSH, self.symbols.functions[node.name])
+            self._code_addr_pushes.add(self._emit(Opcode.PUSH, self.symbols.functions[node.name]))
             return
 
-        if not self.symbols.exists(node.name):
-            raise CodeGenError(f"Неопределенная переменная: {node.name}")
-        
-        var_info = self.symbols.get(node.name)
+        var_info = self._resolve(node)
         if isinstance(var_info, dict) and 'address' in var_info:
             # Переменная в памяти
             self._emit(Opcode.PUSH, var_info['address'])
@@ -195,39 +594,64 @@ class CodeGenerator(ASTVisitor):
     
     def visit_binary_operation(self, node: BinaryOperation) -> Any:
         """Посетить бинарную операцию."""
-        # Генерируем код для операндов (стековая машина)
-        node.left.accept(self)
-        node.right.accept(self)
-        
-        # Генерируем операцию
-        op_map = {
-            '+': Opcode.ADD,
-            '-': Opcode.SUB,
-            '*': Opcode.MUL,
-            '/': Opcode.DIV,
-            '%': Opcode.MOD,
-            '==': Opcode.EQ,
-            '!=': Opcode.NE,
-            '<': Opcode.LT,
-            '<=': Opcode.LE,
-            '>': Opcode.GT,
-            '>=': Opcode.GE,
-            '&&': Opcode.AND,
-            '||': Opcode.OR,
-            'and': Opcode.AND,
-            'or': Opcode.OR,
-        }
+        # Чисто литеральные поддеревья сворачиваются в один PUSH
+        # (операнд инструкции — 24 бита, большие значения не сворачиваем)
+        folded = self._try_fold(node)
+        if folded is not None and self._emit_folded(folded):
+            return
         
-        if node.operator in op_map:
-            self._emit(op_map[node.operator])
+        # Выбираем операцию: быстрый путь — индексация по op_id,
+        # запасной — поиск по строке для узлов, построенных вручную
+        op_id = node.op_id
+        if op_id >= 0:
+            opcode = BINARY_OP_TABLE[op_id]
         else:
-            raise CodeGenError(f"Неизвестная бинарная операция: {node.operator}")
+            mapped = BINARY_OP_MAP.get(node.operator)
+            if mapped is None:
+                raise CodeGenError(f"Неизвестная бинарная операция: {node.operator}")
+            opcode = mapped
+        
+        # AND/OR процессора битовые, поэтому операнды логических && / ||
+        # приводятся к каноническим 0/1 сравнением против нуля — ветвлений
+        # короткое замыкание не требует, оценка остаётся безусловной
+        canonicalize = opcode is Opcode.AND or opcode is Opcode.OR
+        
+        node.left.accept(self)
+        if canonicalize and not self._is_boolean_expr(node.left):
+            self._emit(Opcode.PUSH, 0)
+            self._emit(Opcode.NE)
+        node.right.accept(self)
+        if canonicalize and not self._is_boolean_expr(node.right):
+            self._emit(Opcode.PUSH, 0)
+            self._emit(Opcode.NE)
+        
+        self._emit(opcode)
+    
+    @staticmethod
+    def _is_boolean_expr(node: Expression) -> bool:
+        """Гарантированно ли выражение оставляет на стеке 0 или 1."""
+        if isinstance(node, BooleanLiteral):
+            return True
+        if isinstance(node, BinaryOperation):
+            return node.operator in ('==', '!=', '<', '<=', '>', '>=',
+                                     '&&', '||', 'and', 'or')
+        # UnaryOperation здесь сознательно отсутствует: '!' транслируется
+        # в битовый NOT (~x по 32-битной маске), но не в 0/1, поэтому
+        # результат '!' обязан проходить нормализацию как любой другой
+        return False
     
     def visit_unary_operation(self, node: UnaryOperation) -> Any:
         """Посетить унарную операцию."""
+        folded = self._try_fold(node)
+        if folded is not None and self._emit_folded(folded):
+            return
+        
         node.operand.accept(self)
         
-        if node.operator == '-':
+        op_id = node.op_id
+        if op_id >= 0:
+            self._emit(UNARY_OP_TABLE[op_id])
+        elif node.operator == '-':
             self._emit(Opcode.NEG)
         elif node.operator in {'!', 'not'}:
             self._emit(Opcode.NOT)
@@ -236,8 +660,23 @@ class CodeGenerator(ASTVisitor):
     
     def visit_function_call(self, node: FunctionCall) -> Any:
         """Посетить вызов функции."""
-        if node.name in self.builtin_functions:
-            # Встроенная функция
+        spec = _BUILTIN_SPECS.get(node.name)
+        if spec is not None:
+            # Табличный builtin: аргументы в заданном порядке + хвост
+            nargs, arg_order, tail, feature = spec
+            if feature is not None:
+                self._require_feature(feature, node.name)
+            if len(node.arguments) != nargs:
+                raise CodeGenError(
+                    f"{node.name} принимает аргументов: {nargs}",
+                )
+            arguments = node.arguments
+            for index in arg_order:
+                arguments[index].accept(self)
+            for opcode, operand in tail:
+                self._emit(opcode, operand)
+        elif node.name in self.builtin_functions:
+            # Встроенная функция, требующая сложной эмиссии
             self.builtin_functions[node.name](node.arguments)
         elif node.name in self.symbols.functions:
             # Пользовательская функция
@@ -252,40 +691,50 @@ class CodeGenerator(ASTVisitor):
     
     def visit_vector_literal(self, node: VectorLiteral) -> Any:
         """Посетить векторный литерал."""
-        # Векторы сохраняем в памяти данных
-        vector_data = bytearray()
-        
-        # Сначала записываем размер вектора
-        vector_data.extend(struct.pack('<I', len(node.elements)))
-        
-        # Затем элементы (предполагаем 32-битные числа)
+        # Векторы сохраняем в памяти данных: [size][elem0][elem1]...
+        # Формат собирается целиком и пакуется одним вызовом struct.pack
+        fmt_parts = ['<I']
+        values: List[float] = [len(node.elements)]
+        all_int = True
+        all_float = True
         for element in node.elements:
-            if isinstance(element, NumberLiteral):
-                if isinstance(element.value, float):
-                    vector_data.extend(struct.pack('<f', element.value))
-                else:
-                    vector_data.extend(struct.pack('<I', int(element.value)))
-            else:
+            if not isinstance(element, NumberLiteral):
                 raise CodeGenError("Векторы могут содержать только числовые литералы")
-        
-        addr = self.machine_code.add_data(vector_data)
+            if isinstance(element.value, float):
+                fmt_parts.append('f')
+                values.append(element.value)
+                all_int = False
+            else:
+                fmt_parts.append('I')
+                values.append(int(element.value))
+                all_float = False
+        
+        if (np is not None and len(values) - 1 >= _NUMPY_VECTOR_MIN
+                and (all_int or all_float)):
+            # Однородный крупный литерал: одна C-итерация вместо
+            # поэлементной упаковки (байтовый формат тот же — '<u4'/'<f4')
+            arr = np.fromiter(values[1:], dtype='<u4' if all_int else '<f4',
+                               count=len(values) - 1)
+            blob = _PACK_I(values[0]) + arr.tobytes()
+        else:
+            blob = struct.pack(''.join(fmt_parts), *values)
+        
+        # Одинаковые литералы разделяют одну копию в памяти данных
+        # (та же схема, что и для строк в _get_string_address)
+        addr = self.symbols.vectors.get(blob)
+        if addr is None:
+            addr = self._add_data(blob)
+            self.symbols.vectors[blob] = addr
         self._emit(Opcode.PUSH, addr)
     
     def visit_array_access(self, node: ArrayAccess) -> Any:
         """Посетить доступ к элементу массива."""
-        # Загружаем базовый адрес массива
+        # Базовый адрес массива и индекс; адресную арифметику
+        # base + 4 + index*4 процессор выполняет внутри LOAD_ELEM —
+        # одна диспетчеризация вместо семи на каждый доступ
         node.array.accept(self)
-        # Загружаем индекс
         node.index.accept(self)
-        
-        # Вычисляем адрес элемента для вектора в формате [size][elem0][elem1]...
-        # addr + 4 (пропустить size) + index * 4
-        self._emit(Opcode.PUSH, 4)   # ... * 4
-        self._emit(Opcode.MUL)       # index * 4
-        self._emit(Opcode.PUSH, 4)   # + 4 (смещение после size)
-        self._emit(Opcode.ADD)       # offset + 4
-        self._emit(Opcode.ADD)       # addr + (offset+4)
-        self._emit(Opcode.LOAD)     # Загрузить значение
+        self._emit(Opcode.LOAD_ELEM)
     
     def visit_expression_statement(self, node: ExpressionStatement) -> Any:
         """Посетить выражение как оператор."""
@@ -304,22 +753,18 @@ class CodeGenerator(ASTVisitor):
         else:
             self._emit(Opcode.PUSH, 0)  # Значение по умолчанию
         
-        # Выделяем место в памяти данных
-        addr = self.machine_code.add_word(0)
-        
-        # Сохраняем значение в памяти
-        self._emit(Opcode.PUSH, addr)
-        self._emit(Opcode.STORE)
+        # Выделяем место в памяти данных и сохраняем значение одной
+        # инструкцией: адрес слота известен на этапе компиляции, так что
+        # STORE_DIRECT заменяет пару PUSH addr; STORE
+        addr = self._add_word(0)
+        self._emit(Opcode.STORE_DIRECT, addr)
         
         # Записываем в таблицу символов
         self.symbols.define(node.name, {'address': addr, 'const': node.is_const})
     
     def visit_assignment(self, node: Assignment) -> Any:
         """Посетить присваивание."""
-        if not self.symbols.exists(node.target.name):
-            raise CodeGenError(f"Неопределенная переменная: {node.target.name}")
-        
-        var_info = self.symbols.get(node.target.name)
+        var_info = self._resolve(node.target)
         if isinstance(var_info, dict) and var_info.get('const', False):
             raise CodeGenError(f"Нельзя изменять константу: {node.target.name}")
         
@@ -369,22 +814,22 @@ class CodeGenerator(ASTVisitor):
             jump_to_end = self._emit(Opcode.JMP, 0)
             
             # Else ветка
-            else_addr = len(self.machine_code.instructions)
+            else_addr = len(self._ops)
             self._patch_address(jump_to_else, else_addr)
             
             node.else_stmt.accept(self)
             
             # Конец if
-            end_addr = len(self.machine_code.instructions)
+            end_addr = len(self._ops)
             self._patch_address(jump_to_end, end_addr)
         else:
             # Конец if
-            end_addr = len(self.machine_code.instructions)
+            end_addr = len(self._ops)
             self._patch_address(jump_to_else, end_addr)
     
     def visit_while_statement(self, node: WhileStatement) -> Any:
         """Посетить цикл while."""
-        loop_start = len(self.machine_code.instructions)
+        loop_start = len(self._ops)
         
         # Вычисляем условие
         node.condition.accept(self)
@@ -401,49 +846,16 @@ class CodeGenerator(ASTVisitor):
         self._emit(Opcode.JMP, loop_start)
         
         # Конец цикла
-        end_addr = len(self.machine_code.instructions)
+        end_addr = len(self._ops)
         self._patch_address(jump_to_end, end_addr)
     
     def visit_for_statement(self, node: ForStatement) -> Any:
-        """Посетить цикл for."""
-        self.symbols.enter_scope()
-        try:
-            # Инициализация
-            if node.init:
-                node.init.accept(self)
-            
-            loop_start = len(self.machine_code.instructions)
-            
-            # Условие
-            if node.condition:
-                node.condition.accept(self)
-                jump_to_end = self._emit(Opcode.JZ, 0)
-            else:
-                jump_to_end = None
-            
-            # Тело цикла
-            continue_addr = len(self.machine_code.instructions)
-            if jump_to_end:
-                self.loop_stack.append({'continue': continue_addr, 'break': jump_to_end})
-            node.body.accept(self)
-            if jump_to_end:
-                self.loop_stack.pop()
-            
-            # Обновление
-            if node.update:
-                node.update.accept(self)
-                self._emit(Opcode.POP)  # Убираем результат
-            
-            # Переход к началу
-            self._emit(Opcode.JMP, loop_start)
-            
-            # Конец цикла
-            if jump_to_end:
-                end_addr = len(self.machine_code.instructions)
-                self._patch_address(jump_to_end, end_addr)
-                
-        finally:
-            self.symbols.exit_scope()
+        """Посетить цикл for.
+
+        Цикл понижается в Block с WhileStatement (см. lower_for),
+        поэтому отдельной логики генерации для for не требуется.
+        """
+        lower_for(node).accept(self)
     
     def visit_function_declaration(self, node: FunctionDeclaration) -> Any:
         """Посетить объявление функции."""
@@ -451,20 +863,22 @@ class CodeGenerator(ASTVisitor):
         skip_jmp_addr = self._emit(Opcode.JMP, 0)
 
         # Адрес функции начинается здесь
-        func_addr = len(self.machine_code.instructions)
+        func_addr = len(self._ops)
         self.symbols.functions[node.name] = func_addr
 
         # Входим в область видимости функции
         self.symbols.enter_scope()
         
-        # Параметры уже на стеке (переданы при вызове)
-        # Определяем их в локальной области видимости
-        for _i, param in enumerate(reversed(node.parameters)):
-            # Выделяем место в памяти для параметра
-            addr = self.machine_code.add_word(0)
-            self._emit(Opcode.PUSH, addr)
-            self._emit(Opcode.STORE)
-            self.symbols.define(param, {'address': addr, 'const': False})
+        # Параметры уже на стеке (переданы при вызове).
+        # Под все параметры выделяется один непрерывный кадр в памяти
+        # данных (одна аллокация вместо add_word на параметр), при этом
+        # снятие значений идёт через STORE_DIRECT без промежуточного PUSH
+        if node.parameters:
+            frame_base = self._add_data(b'\x00' * (4 * len(node.parameters)))
+            for i, param in enumerate(reversed(node.parameters)):
+                addr = frame_base + 4 * i
+                self._emit(Opcode.STORE_DIRECT, addr)
+                self.symbols.define(param, {'address': addr, 'const': False})
         
         # Тело функции
         node.body.accept(self)
@@ -475,7 +889,7 @@ class CodeGenerator(ASTVisitor):
         self.symbols.exit_scope()
         
         # Пропатчить прыжок через тело функции
-        end_addr = len(self.machine_code.instructions)
+        end_addr = len(self._ops)
         self._patch_address(skip_jmp_addr, end_addr)
     
     def visit_return_statement(self, node: ReturnStatement) -> Any:
@@ -487,40 +901,7 @@ class CodeGenerator(ASTVisitor):
         
         self._emit(Opcode.RET)
     
-    # Встроенные функции
-    def _generate_print(self, arguments: List[Expression]) -> None:
-        """Генерировать код для print."""
-        if len(arguments) != 1:
-            raise CodeGenError("print принимает ровно один аргумент")
-        
-        arguments[0].accept(self)
-        
-        # Assume the argument is a C-string address and print via port
-        self._emit(Opcode.OUT, self.OUTPUT_PORT)
-    
-    def _generate_read(self, arguments: List[Expression]) -> None:
-        """Генерировать код для read."""
-        if len(arguments) != 0:
-            raise CodeGenError("read не принимает аргументов")
-        
-        self._emit(Opcode.IN, self.INPUT_PORT)
-
-    def _generate_print_number(self, arguments: List[Expression]) -> None:
-        """Генерировать код для print_number."""
-        if len(arguments) != 1:
-            raise CodeGenError("print_number принимает ровно один аргумент")
-        arguments[0].accept(self)
-        # Output number via port 0 (Digit), per example_harv convention
-        self._emit(Opcode.OUT, 0)
-    
-    def _generate_read_int(self, arguments: List[Expression]) -> None:
-        """Генерировать код для readInt."""
-        if len(arguments) != 0:
-            raise CodeGenError("readInt не принимает аргументов")
-        
-        self._emit(Opcode.IN, self.INPUT_PORT)
-        # Assume input is already numeric
-    
+    # Встроенные функции, требующие сложной эмиссии (простые — в _BUILTIN_SPECS)
     def _generate_alloc(self, arguments: List[Expression]) -> None:
         """Выделить блок size байт в памяти данных и вернуть адрес."""
         if len(arguments) != 1:
@@ -530,14 +911,14 @@ class CodeGenerator(ASTVisitor):
         if not isinstance(arg, NumberLiteral) or isinstance(arg.value, float):
             raise CodeGenError("alloc требует целочисленный литерал размера")
         size = int(arg.value)
-        addr = self.machine_code.add_data(b"_" * size)
+        addr = self._add_data(b"_" * size)
         self._emit(Opcode.PUSH, addr)
 
     def _generate_read_line(self, arguments: List[Expression]) -> None:
         r"""Читать до \n/0 и выводить посимвольно (прежняя простая версия)."""
         if len(arguments) != 0:
             raise CodeGenError("readLine не принимает аргументов")
-        loop_start = len(self.machine_code.instructions)
+        loop_start = len(self._ops)
         self._emit(Opcode.IN, self.INPUT_PORT)
         self._emit(Opcode.DUP)
         self._emit(Opcode.PUSH, 0)
@@ -549,155 +930,12 @@ class CodeGenerator(ASTVisitor):
         j1 = self._emit(Opcode.JNZ, 0)
         self._emit(Opcode.OUT, self.OUTPUT_PORT)
         self._emit(Opcode.JMP, loop_start)
-        end = len(self.machine_code.instructions)
+        end = len(self._ops)
         self._patch_address(j0, end)
         self._patch_address(j1, end)
         self._emit(Opcode.POP)
         self._emit(Opcode.PUSH, 0)
 
-    def _generate_read_line_buf(self, arguments: List[Expression]) -> None:
-        """readLineBuf(bufAddr, maxLen): читать в буфер C-строку, завершить 0, не переполняя."""
-        if len(arguments) != ARGS_2:
-            raise CodeGenError("readLineBuf(bufAddr, maxLen)")
-        # Выделяем скрытую переменную p (указатель на текущую позицию)
-        p_addr = self.machine_code.add_word(0)
-        # Initialize p = bufAddr
-        arguments[0].accept(self)             # buf
-        self._emit(Opcode.PUSH, p_addr)       # buf, p_addr
-        self._emit(Opcode.STORE)              # MEM[p_addr] = buf
-        # loop:
-        loop_start = len(self.machine_code.instructions)
-        # If (p - buf) >= maxLen-1 -> end
-        self._emit(Opcode.PUSH, p_addr)
-        self._emit(Opcode.LOAD)               # p
-        arguments[0].accept(self)             # p, buf
-        self._emit(Opcode.SUB)                # p - buf
-        arguments[1].accept(self)             # (p-buf), maxLen
-        self._emit(Opcode.PUSH, 1)
-        self._emit(Opcode.SUB)                # maxLen-1
-        self._emit(Opcode.GE)
-        j_end_full = self._emit(Opcode.JNZ, 0)
-        # Read one char and perform checks
-        self._emit(Opcode.IN, self.INPUT_PORT)
-        self._emit(Opcode.DUP)
-        self._emit(Opcode.PUSH, 0)
-        self._emit(Opcode.EQ)
-        j_end_zero = self._emit(Opcode.JNZ, 0)
-        self._emit(Opcode.DUP)
-        self._emit(Opcode.PUSH, 10)
-        self._emit(Opcode.EQ)
-        j_end_nl = self._emit(Opcode.JNZ, 0)
-        self._emit(Opcode.PUSH, p_addr)
-        self._emit(Opcode.LOAD)               # ch, p  (p on top)
-        self._emit(Opcode.STOREB)
-        # Advance pointer by 1
-        self._emit(Opcode.PUSH, p_addr)
-        self._emit(Opcode.LOAD)
-        self._emit(Opcode.PUSH, 1)
-        self._emit(Opcode.ADD)
-        self._emit(Opcode.PUSH, p_addr)
-        self._emit(Opcode.STORE)
-        # loop
-        self._emit(Opcode.JMP, loop_start)
-        # end:
-        end_addr = len(self.machine_code.instructions)
-        self._patch_address(j_end_full, end_addr)
-        self._patch_address(j_end_zero, end_addr)
-        self._patch_address(j_end_nl, end_addr)
-        # Write string terminator: *p = 0
-        self._emit(Opcode.PUSH, p_addr)
-        self._emit(Opcode.LOAD)
-        self._emit(Opcode.PUSH, 0)
-        self._emit(Opcode.SWAP)               # 0, p
-        self._emit(Opcode.STOREB)
-    
-    def _generate_len(self, arguments: List[Expression]) -> None:
-        """Генерировать код для len."""
-        if len(arguments) != 1:
-            raise CodeGenError("len принимает ровно один аргумент")
-        
-        arguments[0].accept(self)
-        # Для векторов/массивов первые 4 байта содержат размер
-        self._emit(Opcode.LOAD)
-
-    def _generate_chr(self, arguments: List[Expression]) -> None:
-        """Генерировать код для chr - преобразование числа в символ."""
-        if len(arguments) != 1:
-            raise CodeGenError("chr принимает ровно один аргумент")
-        
-        arguments[0].accept(self)
-        # Return number as-is (character code); could convert to string in real impl
-
-    def _generate_putc(self, arguments: List[Expression]) -> None:
-        """Вывод одного символа (код в TOS) через порт 2."""
-        if len(arguments) != 1:
-            raise CodeGenError("putc принимает ровно один аргумент")
-        arguments[0].accept(self)
-        self._emit(Opcode.OUT, 2)
-
-    # Векторные builtin'ы (тонкая обёртка над V_* инструкциями CPU)
-    def _generate_v_load(self, arguments: List[Expression]) -> None:
-        if len(arguments) != ARGS_3:
-            raise CodeGenError("v_load(addr, length, reg)")
-        # Порядок для стека: addr, length, reg
-        arguments[0].accept(self)
-        arguments[1].accept(self)
-        arguments[2].accept(self)
-        self._emit(Opcode.V_LOAD)
-
-    def _generate_v_add(self, arguments: List[Expression]) -> None:
-        if len(arguments) != ARGS_3:
-            raise CodeGenError("v_add(reg1, reg2, result_reg)")
-        # Порядок на стеке: reg1, reg2, result
-        arguments[0].accept(self)
-        arguments[1].accept(self)
-        arguments[2].accept(self)
-        self._emit(Opcode.V_ADD)
-
-    def _generate_v_dot(self, arguments: List[Expression]) -> None:
-        if len(arguments) != ARGS_2:
-            raise CodeGenError("v_dot(reg1, reg2)")
-        arguments[0].accept(self)
-        arguments[1].accept(self)
-        self._emit(Opcode.V_DOT)
-
-    def _generate_v_store(self, arguments: List[Expression]) -> None:
-        if len(arguments) != ARGS_2:
-            raise CodeGenError("v_store(reg, addr)")
-        # порядок на стеке: addr, reg
-        arguments[1].accept(self)
-        arguments[0].accept(self)
-        self._emit(Opcode.V_STORE)
-
-    def _generate_v_sum(self, arguments: List[Expression]) -> None:
-        if len(arguments) != 1:
-            raise CodeGenError("v_sum(reg)")
-        arguments[0].accept(self)
-        self._emit(Opcode.V_SUM)
-
-    def _generate_set_interrupt_handler(self, arguments: List[Expression]) -> None:
-        """Генерировать код для set_interrupt_handler."""
-        if len(arguments) != ARGS_2:
-            raise CodeGenError("set_interrupt_handler принимает 2 аргумента")
-        
-        arguments[0].accept(self)  # Номер прерывания
-        arguments[1].accept(self)  # Адрес обработчика
-        self._emit(Opcode.INT, 0x80)  # Системный вызов для установки обработчика
-
-    def _generate_enable_interrupts(self, arguments: List[Expression]) -> None:
-        """Генерировать код для enable_interrupts."""
-        if len(arguments) != 0:
-            raise CodeGenError("enable_interrupts не принимает аргументов")
-        
-        self._emit(Opcode.INT, 0x81)  # Системный вызов для включения прерываний
-
-    def _generate_disable_interrupts(self, arguments: List[Expression]) -> None:
-        """Генерировать код для disable_interrupts."""
-        if len(arguments) != 0:
-            raise CodeGenError("disable_interrupts не принимает аргументов")
-        
-        self._emit(Opcode.INT, 0x82)  # Системный вызов для отключения прерываний
-
 
 def generate_code(program: Program) -> MachineCode:
     """Удобная функция для генерации кода."""
@@ -1,10 +1,90 @@
 """Lexer for the Alg-like language syntax."""
 
+import re
+import sys
 from typing import List
 
 from .tokens import Token, TokenType, KEYWORDS, TWO_CHAR_OPERATORS, SINGLE_CHAR_OPERATORS
 
 
+# Отображение escape-последовательностей; прочие символы после '\\'
+# подставляются как есть (в т.ч. сама кавычка)
+ESCAPE_SEQUENCES = {
+    'n': '\n',
+    't': '\t',
+    'r': '\r',
+    '\\': '\\',
+    '0': '\0',
+}
+
+
+# Классификация символов по 256-байтовой таблице: одна индексация и
+# битовая маска вместо Unicode-классификаторов isdigit/isalpha/isalnum
+# на каждый символ. Символы, чей код >= 256 (кириллица в идентификаторах),
+# считаются буквами, как их классифицировал бы str.isalpha.
+CC_DIGIT = 1
+CC_ALPHA = 2   # буква или '_'
+CC_SPACE = 4   # пробельные, кроме перевода строки
+
+
+def _char_class(code: int) -> int:
+    char = chr(code)
+    cls = 0
+    # Только ASCII 0-9: str.isdigit() принимает и надстрочные цифры
+    # вроде U+00B2, которые _NUM_RE не матчит, — такие символы должны
+    # падать как Unknown symbol, но не уходить в read_number
+    if '0' <= char <= '9':
+        cls |= CC_DIGIT
+    if char.isalpha() or char == '_':
+        cls |= CC_ALPHA
+    if char in ' \t\r':
+        cls |= CC_SPACE
+    return cls
+
+
+# Размер таблицы классов: коды >= _CHAR_CLASS_LIMIT идут по медленному пути
+_CHAR_CLASS_LIMIT = 256
+
+CHAR_CLASS = bytes(_char_class(code) for code in range(_CHAR_CLASS_LIMIT))
+
+# Прекомпилированные шаблоны: пробег по лексеме выполняется C-движком
+# sre за один вызов вместо питоновского цикла по символам.
+# [^\W\d]\w* эквивалентно прежней проверке isalpha/'_' + isalnum/'_'.
+_ID_RE = re.compile(r'[^\W\d]\w*')
+_WS_RE = re.compile(r'[ \t\r]+')
+_NUM_RE = re.compile(r'[0-9]+(?:\.[0-9]+)?')
+
+
+def _build_op_dispatch() -> dict:
+    """Специализировать таблицы операторов под фиксированную грамматику.
+
+    Грамматика операторов известна при импорте, поэтому вместо двух
+    словарных поисков на оператор (склейка двухсимвольной строки +
+    TWO_CHAR_OPERATORS, затем SINGLE_CHAR_OPERATORS) строится одна
+    таблица по первому символу: first_char -> (second_chars, single_type),
+    где second_chars отображает допустимый второй символ в тип токена.
+    """
+    dispatch: dict = {}
+    firsts = {op[0] for op in TWO_CHAR_OPERATORS} | set(SINGLE_CHAR_OPERATORS)
+    for first in firsts:
+        seconds = {
+            op[1]: token_type
+            for op, token_type in TWO_CHAR_OPERATORS.items()
+            if op[0] == first
+        }
+        dispatch[first] = (seconds or None, SINGLE_CHAR_OPERATORS.get(first))
+    return dispatch
+
+
+_OP_DISPATCH = _build_op_dispatch()
+
+# Префильтр ключевых слов: почти все идентификаторы программы — не
+# ключевые слова, и дешёвые проверки длины и первого символа позволяют
+# в типичном случае вовсе не хешировать строку в KEYWORDS
+_KW_LENGTHS = frozenset(len(keyword) for keyword in KEYWORDS)
+_KW_FIRST = frozenset(keyword[0] for keyword in KEYWORDS)
+
+
 class LexerError(Exception):
     """Ошибка лексического анализа."""
     
@@ -16,140 +96,188 @@ class LexerError(Exception):
 
 
 class Lexer:
-    """Лексический анализатор."""
-    
+    r"""Лексический анализатор.
+
+    Текст дополняется стражем '\0' (см. reset): все читатели индексируют
+    self.text без проверки границ, а циклы ограничиваются self._len —
+    длиной исходного текста без стража.
+    """
+
     def __init__(self, text: str) -> None:
-        self.text = text
+        self.tokens: List[Token] = []
+        self.reset(text)
+
+    def reset(self, text: str) -> None:
+        """Подготовить экземпляр к разбору нового текста (для пула)."""
+        self.text = text + '\0'
+        self._len = len(text)
         self.pos = 0
         self.line = 1
         self.column = 1
-        self.tokens: List[Token] = []
-    
-    def current_char(self) -> str | None:
-        """Получить текущий символ."""
-        if self.pos >= len(self.text):
-            return None
+        self.tokens = []
+
+    def current_char(self) -> str:
+        r"""Получить текущий символ ('\0'-страж в конце текста)."""
         return self.text[self.pos]
-    
+
     def peek_char(self, offset: int = 1) -> str | None:
         """Посмотреть на символ с заданным смещением."""
         peek_pos = self.pos + offset
-        if peek_pos >= len(self.text):
+        if peek_pos > self._len:
             return None
         return self.text[peek_pos]
-    
+
     def advance(self) -> None:
         """Продвинуться к следующему символу."""
-        if self.pos < len(self.text):
+        if self.pos < self._len:
             if self.text[self.pos] == '\n':
                 self.line += 1
                 self.column = 1
             else:
                 self.column += 1
             self.pos += 1
-    
-    def skip_whitespace(self) -> None:
-        """Пропустить пробельные символы кроме переводов строки."""
-        current = self.current_char()
-        while current and current in ' \t\r':
-            self.advance()
-            current = self.current_char()
-    
-    def skip_comment(self) -> None:
-        """Пропустить комментарий до конца строки."""
-        while self.current_char() and self.current_char() != '\n':
-            self.advance()
+
+    def _skip_trivia(self) -> None:
+        r"""Пропустить пробелы, переводы строк и комментарии одним проходом.
+
+        Объединяет прежние skip_whitespace/skip_comment и ветку перевода
+        строки главного цикла: один вызов на токен вместо трёх, состояние
+        (pos/line/column) держится в локальных переменных до выхода.
+        Страж '\0' делает чтение text[pos + 1] безопасным.
+        """
+        text = self.text
+        n = self._len
+        pos = self.pos
+        line = self.line
+        column = self.column
+        while pos < n:
+            match = _WS_RE.match(text, pos)
+            if match is not None:
+                end = match.end()
+                column += end - pos
+                pos = end
+                if pos >= n:
+                    break
+            current = text[pos]
+            if current == '\n':
+                pos += 1
+                line += 1
+                column = 1
+            elif current == '/' and text[pos + 1] == '/':
+                # Комментарий до конца строки одним str.find;
+                # перевод строки обрабатывает следующая итерация
+                newline_at = text.find('\n', pos, n)
+                end = n if newline_at == -1 else newline_at
+                column += end - pos
+                pos = end
+            else:
+                break
+        self.pos = pos
+        self.line = line
+        self.column = column
     
     def read_number(self) -> Token:
         """Прочитать число."""
         start_line, start_column = self.line, self.column
-        result = ''
-        
-        # Читаем цифры
-        current = self.current_char()
-        while current and current.isdigit():
-            result += current
-            self.advance()
-            current = self.current_char()
-        
-        # Проверяем на десятичную точку
-        next_char = self.peek_char()
-        if current == '.' and next_char and next_char.isdigit():
-            result += current
-            self.advance()
-            
-            current = self.current_char()
-            while current and current.isdigit():
-                result += current
-                self.advance()
-                current = self.current_char()
-            
-            return Token(TokenType.NUMBER, float(result), start_line, start_column)
-        
-        return Token(TokenType.NUMBER, int(result), start_line, start_column)
+        start = self.pos
+
+        # Весь литерал (целая часть и необязательная дробная) распознаётся
+        # одним вызовом прекомпилированного regex; [0-9] вместо \d, чтобы
+        # не захватывать юникодные цифры, которые int/float не примут
+        match = _NUM_RE.match(self.text, start)
+        assert match is not None  # диспетчер next_token гарантирует цифру
+        lexeme = match.group()
+        pos = start + len(lexeme)
+        self.column += pos - start
+        self.pos = pos
+        value = float(lexeme) if '.' in lexeme else int(lexeme)
+        return Token(TokenType.NUMBER, value, start_line, start_column)
     
     def read_string(self) -> Token:
         """Прочитать строку в кавычках."""
         start_line, start_column = self.line, self.column
-        qc = self.current_char()  # '"' or '\''
-        if qc is None:
+        text = self.text
+        n = self._len
+        pos = self.pos
+        if pos >= n:
             raise LexerError("Unterminated string", start_line, start_column)
-        quote_char: str = qc
-        self.advance()  # Пропускаем открывающую кавычку
-        
-        result = ''
-        current = self.current_char()
-        while current and current != quote_char:
-            if current == '\\':
-                self.advance()
-                escape_char = self.current_char()
-                if escape_char == 'n':
-                    result += '\n'
-                elif escape_char == 't':
-                    result += '\t'
-                elif escape_char == 'r':
-                    result += '\r'
-                elif escape_char == '\\':
-                    result += '\\'
-                elif escape_char == quote_char:
-                    result += quote_char
-                elif escape_char == '0':
-                    result += '\0'
-                elif escape_char is not None:
-                    result += escape_char
-                self.advance()
-            else:
-                result += current
-                self.advance()
-            current = self.current_char()
+        quote_char = text[pos]  # '"' or '\''
+        pos += 1  # Пропускаем открывающую кавычку
+        line = start_line
+        column = start_column + 1
         
-        if not current:
-            raise LexerError("Unterminated string", start_line, start_column)
+        # Накапливаем куски в списке: один join вместо O(n^2) конкатенаций.
+        # Чистые пробеги без escape-последовательностей берутся одним срезом
+        # через str.find; посимвольная обработка остаётся только для '\\'.
+        parts: List[str] = []
+        while True:
+            quote_at = text.find(quote_char, pos)
+            if quote_at == -1:
+                raise LexerError("Unterminated string", start_line, start_column)
+            backslash_at = text.find('\\', pos, quote_at)
+            stop = quote_at if backslash_at == -1 else backslash_at
+            if stop > pos:
+                run = text[pos:stop]
+                parts.append(run)
+                newlines = run.count('\n')
+                if newlines:
+                    line += newlines
+                    column = len(run) - run.rfind('\n')
+                else:
+                    column += len(run)
+                pos = stop
+            if backslash_at == -1:
+                break
+            pos += 1  # Пропускаем '\\'
+            column += 1
+            if pos < n:
+                escape_char = text[pos]
+                parts.append(ESCAPE_SEQUENCES.get(escape_char, escape_char))
+                if escape_char == '\n':
+                    line += 1
+                    column = 1
+                else:
+                    column += 1
+                pos += 1
         
-        self.advance()  # Пропускаем закрывающую кавычку
-        return Token(TokenType.STRING, result, start_line, start_column)
+        pos += 1  # Пропускаем закрывающую кавычку
+        self.pos = pos
+        self.line = line
+        self.column = column + 1
+        return Token(TokenType.STRING, ''.join(parts), start_line, start_column)
     
     def read_identifier(self) -> Token:
         """Прочитать идентификатор или ключевое слово."""
         start_line, start_column = self.line, self.column
-        result = ''
-        
-        # Первый символ - буква или _
-        current = self.current_char()
-        if current and (current.isalpha() or current == '_'):
-            result += current
-            self.advance()
-        
-        # Остальные символы - буквы, цифры или _
-        current = self.current_char()
-        while current and (current.isalnum() or current == '_'):
-            result += current
-            self.advance()
-            current = self.current_char()
-        
+        text = self.text
+        start = self.pos
+        pos = start
+
+        # Первый символ - буква или _, остальные - буквы, цифры или _;
+        # весь пробег выполняется одним вызовом прекомпилированного regex
+        match = _ID_RE.match(text, pos)
+        if match is None:
+            # Сюда попадают символы >= U+0100, не являющиеся буквами
+            # (например, '€'): без ошибки лексер зациклился бы,
+            # возвращая пустые идентификаторы на той же позиции
+            raise LexerError(f"Unknown symbol: {text[pos]!r}",
+                             start_line, start_column)
+        pos = match.end()
+
+        self.column += pos - start
+        self.pos = pos
+        # Интернирование: одно и то же имя даёт один строковый объект,
+        # так что сравнения и словарные поиски ниже по конвейеру —
+        # это сравнение указателей плюс закэшированный хеш
+        result = sys.intern(text[start:pos])
+
         # Проверяем, является ли идентификатор ключевым словом
-        token_type = KEYWORDS.get(result, TokenType.IDENTIFIER)
-        
+        # (префильтр по длине и первому символу — см. _KW_LENGTHS)
+        if len(result) in _KW_LENGTHS and result[0] in _KW_FIRST:
+            token_type = KEYWORDS.get(result, TokenType.IDENTIFIER)
+        else:
+            token_type = TokenType.IDENTIFIER
+
         if token_type in (TokenType.TRUE, TokenType.FALSE):
             value = result == 'true'
             return Token(token_type, value, start_line, start_column)
@@ -161,65 +289,86 @@ class Lexer:
     def read_operator(self) -> Token:
         """Прочитать оператор."""
         start_line, start_column = self.line, self.column
-        
-        # Проверяем двухсимвольные операторы
         current = self.current_char()
-        next_char = self.peek_char()
-        if current and next_char:
-            two_char = current + next_char
-            if two_char in TWO_CHAR_OPERATORS:
-                self.advance()
-                self.advance()
-                return Token(TWO_CHAR_OPERATORS[two_char], two_char, start_line, start_column)
-        
-        # Проверяем односимвольные операторы
-        if current and current in SINGLE_CHAR_OPERATORS:
+
+        # Один поиск по первому символу вместо склейки двухсимвольной
+        # строки и двух словарных проверок (см. _build_op_dispatch)
+        entry = _OP_DISPATCH.get(current) if current else None
+        if entry is None:
+            raise LexerError(f"Unknown symbol: {current!r}", start_line, start_column)
+
+        seconds, single_type = entry
+        if seconds is not None:
+            next_char = self.peek_char()
+            if next_char is not None:
+                two_type = seconds.get(next_char)
+                if two_type is not None:
+                    self.advance()
+                    self.advance()
+                    return Token(two_type, current + next_char, start_line, start_column)
+
+        if single_type is not None:
             self.advance()
-            return Token(SINGLE_CHAR_OPERATORS[current], current, start_line, start_column)
-        
+            return Token(single_type, current, start_line, start_column)
+
         raise LexerError(f"Unknown symbol: {current!r}", start_line, start_column)
     
+    def next_token(self) -> Token:
+        """Вернуть следующий токен; по исчерпании текста — EOF.
+
+        Состояние (pos/line/column) хранится в экземпляре, так что метод
+        резюмируем: потребитель может тянуть токены по одному, не
+        материализуя весь список (pull-модель). По окончании текста
+        каждый вызов возвращает свежий EOF-токен.
+        """
+        self._skip_trivia()
+
+        if self.pos >= self._len:
+            return Token(TokenType.EOF, None, self.line, self.column)
+        current = self.text[self.pos]
+
+        # Числа
+        if (code := ord(current)) < _CHAR_CLASS_LIMIT and CHAR_CLASS[code] & CC_DIGIT:
+            return self.read_number()
+
+        # Строки
+        if current in ('"', "'"):
+            return self.read_string()
+
+        # Идентификаторы и ключевые слова
+        if code >= _CHAR_CLASS_LIMIT or CHAR_CLASS[code] & CC_ALPHA:
+            return self.read_identifier()
+
+        # Операторы и разделители
+        return self.read_operator()
+
     def tokenize(self) -> List[Token]:
         """Выполнить лексический анализ и вернуть список токенов."""
         self.tokens = []
-        
-        while self.pos < len(self.text):
-            self.skip_whitespace()
-            
-            current = self.current_char()
-            if not current:
-                break
-            
-            # Перевод строки (игнорируем как отдельный токен)
-            if current == '\n':
-                self.advance()
-            
-            # Комментарии
-            elif current == '/' and self.peek_char() == '/':
-                self.skip_comment()
-            
-            # Числа
-            elif current.isdigit():
-                self.tokens.append(self.read_number())
-            
-            # Строки
-            elif current in ('"', "'"):
-                self.tokens.append(self.read_string())
-            
-            # Идентификаторы и ключевые слова
-            elif current.isalpha() or current == '_':
-                self.tokens.append(self.read_identifier())
-            
-            # Операторы и разделители
-            else:
-                self.tokens.append(self.read_operator())
-        
-        # Добавляем токен конца файла
-        self.tokens.append(Token(TokenType.EOF, None, self.line, self.column))
-        return self.tokens
+        append = self.tokens.append
+
+        while True:
+            token = self.next_token()
+            append(token)
+            if token.type is TokenType.EOF:
+                return self.tokens
+
+
+# Пул переиспользуемых лексеров: повторные вызовы tokenize не платят
+# за создание объекта заново. Списки токенов не предразмериваются —
+# append CPython-списков при геометрическом росте быстрее, чем
+# заполнение [None]*N по курсору.
+_LEXER_POOL: List[Lexer] = []
 
 
 def tokenize(text: str) -> List[Token]:
     """Tokenize the input text into a list of tokens."""
-    lexer = Lexer(text)
-    return lexer.tokenize()
\ No newline at end of file
+    if _LEXER_POOL:
+        lexer = _LEXER_POOL.pop()
+        lexer.reset(text)
+    else:
+        lexer = Lexer(text)
+    try:
+        return lexer.tokenize()
+    finally:
+        _LEXER_POOL.append(lexer)
\ No newline at end of file
@@ -1,6 +1,6 @@
 """Синтаксический анализатор для алголичного языка."""
 
-from typing import List
+from typing import Callable, ClassVar, Dict, List
 
 from .tokens import Token, TokenType
 from .ast_nodes import (
@@ -19,6 +19,8 @@ from .ast_nodes import (
     Expression,
     BinaryOperation,
     UnaryOperation,
+    BINARY_OP_IDS,
+    UNARY_OP_IDS,
     ArrayAccess,
     FunctionCall,
     BooleanLiteral,
@@ -29,6 +31,16 @@ from .ast_nodes import (
 )
 
 
+# Наборы операторов уровней приоритета: замороженные множества на уровне
+# модуля, чтобы проверка `in` во внутренних циклах не строила кортеж заново
+_EQUALITY_OPS = frozenset((TokenType.EQUAL, TokenType.NOT_EQUAL))
+_COMPARISON_OPS = frozenset((TokenType.GREATER, TokenType.GREATER_EQUAL,
+                             TokenType.LESS, TokenType.LESS_EQUAL))
+_TERM_OPS = frozenset((TokenType.PLUS, TokenType.MINUS))
+_FACTOR_OPS = frozenset((TokenType.MULTIPLY, TokenType.DIVIDE,
+                         TokenType.MODULO, TokenType.POWER))
+
+
 class ParseError(Exception):
     """Ошибка синтаксического анализа."""
     
@@ -42,10 +54,22 @@ class Parser:
     """Рекурсивно-нисходящий парсер."""
     
     def __init__(self, tokens: List[Token]) -> None:
+        # Лексер не выдаёт NEWLINE-токены (переводы строк поглощаются при
+        # токенизации), поэтому входной список используется без фильтрации
         self.tokens = tokens
         self.current = 0
-        # Убираем переводы строк, так как они нам не нужны для парсинга
-        self.tokens = [t for t in self.tokens if t.type != TokenType.NEWLINE]
+        # Пул выражений: одинаковые неизменяемые поддеревья (например, `i + 1`
+        # в теле цикла) интернируются и разделяют один узел AST
+        self._expr_pool: Dict[tuple, Expression] = {}
+
+    def _intern_expr(self, key: tuple, node: Expression) -> Expression:
+        """Интернировать неизменяемое выражение по структурному ключу."""
+        return self._expr_pool.setdefault(key, node)
+
+    def _binary(self, left: Expression, operator: str, right: Expression) -> Expression:
+        """Построить (или переиспользовать) узел бинарной операции."""
+        key = (BinaryOperation, id(left), operator, id(right))
+        return self._intern_expr(key, BinaryOperation(left, operator, right, BINARY_OP_IDS.get(operator, -1)))
     
     def current_token(self) -> Token:
         """Получить текущий токен."""
@@ -70,7 +94,19 @@ class Parser:
     def match(self, *types: TokenType) -> bool:
         """Проверить, соответствует ли текущий токен одному из типов."""
         return self.current_token().type in types
-    
+
+    # Специализации match без *args: CPython не пакует аргументы в кортеж
+    # на каждый вызов. Используются на горячих одно- и двухтиповых проверках.
+
+    def match1(self, token_type: TokenType) -> bool:
+        """Проверить текущий токен на один тип (без кортежа *args)."""
+        return self.current_token().type is token_type
+
+    def match2(self, type_a: TokenType, type_b: TokenType) -> bool:
+        """Проверить текущий токен на один из двух типов."""
+        current_type = self.current_token().type
+        return current_type is type_a or current_type is type_b
+
     def consume(self, token_type: TokenType, message: str) -> Token:
         """Потребить токен заданного типа или выбросить ошибку."""
         if self.current_token().type == token_type:
@@ -82,7 +118,7 @@ class Parser:
         """Главная функция парсинга."""
         statements = []
         
-        while not self.match(TokenType.EOF):
+        while not self.match1(TokenType.EOF):
             stmt = self.declaration()
             if stmt:
                 statements.append(stmt)
@@ -92,11 +128,11 @@ class Parser:
     def declaration(self) -> Statement | None:
         """Объявление (функция или переменная)."""
         try:
-            if self.match(TokenType.FUNCTION):
-                return self.function_declaration()
-            if self.match(TokenType.VAR, TokenType.CONST):
-                return self.var_declaration()
-            
+            # Диспетчеризация по таблице вместо цепочки if match
+            handler = _DECLARATION_DISPATCH.get(self.current_token().type)
+            if handler is not None:
+                return handler(self)
+
             return self.statement()
         except ParseError:
             # Синхронизация при ошибке
@@ -111,9 +147,9 @@ class Parser:
         self.consume(TokenType.LPAREN, "Ожидалась '('")
         
         parameters = []
-        if not self.match(TokenType.RPAREN):
+        if not self.match1(TokenType.RPAREN):
             parameters.append(self.consume(TokenType.IDENTIFIER, "Ожидалось имя параметра").value)
-            while self.match(TokenType.COMMA):
+            while self.match1(TokenType.COMMA):
                 self.advance()  # consume comma
                 parameters.append(self.consume(TokenType.IDENTIFIER, "Ожидалось имя параметра").value)
         
@@ -125,13 +161,13 @@ class Parser:
     
     def var_declaration(self) -> VarDeclaration:
         """Объявление переменной."""
-        is_const = self.match(TokenType.CONST)
+        is_const = self.match1(TokenType.CONST)
         self.advance()  # consume var/const
         
         name_token = self.consume(TokenType.IDENTIFIER, "Ожидалось имя переменной")
         
         initializer = None
-        if self.match(TokenType.ASSIGN):
+        if self.match1(TokenType.ASSIGN):
             self.advance()  # consume =
             initializer = self.expression()
         
@@ -141,17 +177,10 @@ class Parser:
     
     def statement(self) -> Statement:
         """Оператор."""
-        if self.match(TokenType.IF):
-            return self.if_statement()
-        if self.match(TokenType.WHILE):
-            return self.while_statement()
-        if self.match(TokenType.FOR):
-            return self.for_statement()
-        if self.match(TokenType.RETURN):
-            return self.return_statement()
-        if self.match(TokenType.LBRACE):
-            return self.block_statement()
-        
+        handler = _STATEMENT_DISPATCH.get(self.current_token().type)
+        if handler is not None:
+            return handler(self)
+
         return self.expression_statement()
     
     def if_statement(self) -> IfStatement:
@@ -164,7 +193,7 @@ class Parser:
         then_stmt = self.statement()
         
         else_stmt = None
-        if self.match(TokenType.ELSE):
+        if self.match1(TokenType.ELSE):
             self.advance()  # consume else
             else_stmt = self.statement()
         
@@ -188,22 +217,22 @@ class Parser:
         
         # Инициализация
         init: Statement | None = None
-        if self.match(TokenType.SEMICOLON):
+        if self.match1(TokenType.SEMICOLON):
             self.advance()
-        elif self.match(TokenType.VAR):
+        elif self.match1(TokenType.VAR):
             init = self.var_declaration()
         else:
             init = self.expression_statement()
         
         # Условие
         condition: Expression | None = None
-        if not self.match(TokenType.SEMICOLON):
+        if not self.match1(TokenType.SEMICOLON):
             condition = self.expression()
         self.consume(TokenType.SEMICOLON, "Ожидалась ';'")
         
         # Обновление
         update: Expression | None = None
-        if not self.match(TokenType.RPAREN):
+        if not self.match1(TokenType.RPAREN):
             update = self.expression()
         self.consume(TokenType.RPAREN, "Ожидалась ')'")
         
@@ -216,7 +245,7 @@ class Parser:
         self.consume(TokenType.RETURN, "Ожидался 'return'")
         
         value = None
-        if not self.match(TokenType.SEMICOLON):
+        if not self.match1(TokenType.SEMICOLON):
             value = self.expression()
         
         self.consume(TokenType.SEMICOLON, "Ожидалась ';'")
@@ -228,7 +257,7 @@ class Parser:
         self.consume(TokenType.LBRACE, "Ожидалась '{'")
         
         statements = []
-        while not self.match(TokenType.RBRACE) and not self.match(TokenType.EOF):
+        while not self.match2(TokenType.RBRACE, TokenType.EOF):
             stmt = self.declaration()
             if stmt:
                 statements.append(stmt)
@@ -240,10 +269,10 @@ class Parser:
     def expression_statement(self) -> Statement:
         """Выражение как оператор."""
         # Проверяем на присваивание
-        if (self.match(TokenType.IDENTIFIER) and
+        if (self.match1(TokenType.IDENTIFIER) and
             self.peek_token().type in (TokenType.ASSIGN, TokenType.PLUS_ASSIGN, TokenType.MINUS_ASSIGN)):
             
-            target = Identifier(self.advance().value)
+            target = Identifier.get(self.advance().value)
             operator = self.advance().value
             value = self.expression()
             self.consume(TokenType.SEMICOLON, "Ожидалась ';'")
@@ -259,79 +288,100 @@ class Parser:
         """Выражение."""
         return self.logical_or()
     
+    # Внутренние циклы бинарных уровней читают токены через локальные
+    # tokens/i вместо match()/advance(): это убирает 2-3 вызова метода на
+    # итерацию. Перед разбором правого операнда курсор записывается обратно
+    # в self.current и перечитывается после (подвызов двигает курсор).
+    # Токен оператора никогда не последний (за ним минимум EOF), поэтому
+    # локальный i += 1 эквивалентен advance().
+
     def logical_or(self) -> Expression:
         """Логическое ИЛИ."""
         expr = self.logical_and()
-        
-        while self.match(TokenType.OR):
-            operator = self.advance().value
+        tokens = self.tokens
+        i = self.current
+        while tokens[i].type is TokenType.OR:
+            operator = tokens[i].value
+            self.current = i + 1
             right = self.logical_and()
-            expr = BinaryOperation(expr, operator, right)
-        
+            i = self.current
+            expr = self._binary(expr, operator, right)
         return expr
-    
+
     def logical_and(self) -> Expression:
         """Логическое И."""
         expr = self.equality()
-        
-        while self.match(TokenType.AND):
-            operator = self.advance().value
+        tokens = self.tokens
+        i = self.current
+        while tokens[i].type is TokenType.AND:
+            operator = tokens[i].value
+            self.current = i + 1
             right = self.equality()
-            expr = BinaryOperation(expr, operator, right)
-        
+            i = self.current
+            expr = self._binary(expr, operator, right)
         return expr
-    
+
     def equality(self) -> Expression:
         """Равенство."""
         expr = self.comparison()
-        
-        while self.match(TokenType.EQUAL, TokenType.NOT_EQUAL):
-            operator = self.advance().value
+        tokens = self.tokens
+        i = self.current
+        while tokens[i].type in _EQUALITY_OPS:
+            operator = tokens[i].value
+            self.current = i + 1
             right = self.comparison()
-            expr = BinaryOperation(expr, operator, right)
-        
+            i = self.current
+            expr = self._binary(expr, operator, right)
         return expr
-    
+
     def comparison(self) -> Expression:
         """Сравнение."""
         expr = self.term()
-        
-        while self.match(TokenType.GREATER, TokenType.GREATER_EQUAL,
-                          TokenType.LESS, TokenType.LESS_EQUAL):
-            operator = self.advance().value
+        tokens = self.tokens
+        i = self.current
+        while tokens[i].type in _COMPARISON_OPS:
+            operator = tokens[i].value
+            self.current = i + 1
             right = self.term()
-            expr = BinaryOperation(expr, operator, right)
-        
+            i = self.current
+            expr = self._binary(expr, operator, right)
         return expr
-    
+
     def term(self) -> Expression:
         """Сложение и вычитание."""
         expr = self.factor()
-        
-        while self.match(TokenType.PLUS, TokenType.MINUS):
-            operator = self.advance().value
+        tokens = self.tokens
+        i = self.current
+        while tokens[i].type in _TERM_OPS:
+            operator = tokens[i].value
+            self.current = i + 1
             right = self.factor()
-            expr = BinaryOperation(expr, operator, right)
-        
+            i = self.current
+            expr = self._binary(expr, operator, right)
         return expr
-    
+
     def factor(self) -> Expression:
         """Умножение, деление, возведение в степень."""
         expr = self.unary()
-        
-        while self.match(TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.MODULO, TokenType.POWER):
-            operator = self.advance().value
+        tokens = self.tokens
+        i = self.current
+        while tokens[i].type in _FACTOR_OPS:
+            operator = tokens[i].value
+            self.current = i + 1
             right = self.unary()
-            expr = BinaryOperation(expr, operator, right)
-        
+            i = self.current
+            expr = self._binary(expr, operator, right)
         return expr
     
     def unary(self) -> Expression:
         """Унарные операции."""
-        if self.match(TokenType.NOT, TokenType.MINUS):
+        if self.match2(TokenType.NOT, TokenType.MINUS):
             operator = self.advance().value
             expr = self.unary()
-            return UnaryOperation(operator, expr)
+            return self._intern_expr(
+                (UnaryOperation, operator, id(expr)),
+                UnaryOperation(operator, expr, UNARY_OP_IDS.get(operator, -1)),
+            )
         
         return self.call()
     
@@ -340,9 +390,9 @@ class Parser:
         expr = self.primary()
         
         while True:
-            if self.match(TokenType.LPAREN):
+            if self.match1(TokenType.LPAREN):
                 expr = self.finish_call(expr)
-            elif self.match(TokenType.LBRACKET):
+            elif self.match1(TokenType.LBRACKET):
                 self.advance()  # consume [
                 index = self.expression()
                 self.consume(TokenType.RBRACKET, "Ожидалась ']'")
@@ -357,9 +407,9 @@ class Parser:
         self.advance()  # consume (
         
         arguments = []
-        if not self.match(TokenType.RPAREN):
+        if not self.match1(TokenType.RPAREN):
             arguments.append(self.expression())
-            while self.match(TokenType.COMMA):
+            while self.match1(TokenType.COMMA):
                 self.advance()  # consume comma
                 arguments.append(self.expression())
         
@@ -372,41 +422,53 @@ class Parser:
     
     def primary(self) -> Expression:
         """Первичные выражения."""
-        if self.match(TokenType.TRUE):
-            self.advance()
-            return BooleanLiteral(value=True)
-        
-        if self.match(TokenType.FALSE):
-            self.advance()
-            return BooleanLiteral(value=False)
-        
-        if self.match(TokenType.NULL):
-            self.advance()
-            return NullLiteral()
-        
-        if self.match(TokenType.NUMBER):
-            return NumberLiteral(self.advance().value)
-        
-        if self.match(TokenType.STRING):
-            return StringLiteral(self.advance().value)
-        
-        if self.match(TokenType.IDENTIFIER):
-            return Identifier(self.advance().value)
-        
-        if self.match(TokenType.LPAREN):
-            self.advance()  # consume (
-            expr = self.expression()
-            self.consume(TokenType.RPAREN, "Ожидалась ')'")
-            return expr
-        
+        handler = self._PRIMARY_DISPATCH.get(self.current_token().type)
+        if handler is not None:
+            return handler(self)
+
+        # Редкие случаи (векторные литералы, встроенные функции) и ошибка
+        return self._primary_fallback()
+
+    def _primary_true(self) -> Expression:
+        self.advance()
+        return self._intern_expr((BooleanLiteral, True), BooleanLiteral(value=True))
+
+    def _primary_false(self) -> Expression:
+        self.advance()
+        return self._intern_expr((BooleanLiteral, False), BooleanLiteral(value=False))
+
+    def _primary_null(self) -> Expression:
+        self.advance()
+        return self._intern_expr((NullLiteral,), NullLiteral())
+
+    def _primary_number(self) -> Expression:
+        value = self.advance().value
+        # Тип в ключе различает 1 и 1.0 (равны и одинаково хэшируются)
+        return self._intern_expr((NumberLiteral, type(value), value), NumberLiteral(value))
+
+    def _primary_string(self) -> Expression:
+        value = self.advance().value
+        return self._intern_expr((StringLiteral, value), StringLiteral(value))
+
+    def _primary_identifier(self) -> Expression:
+        return Identifier.get(self.advance().value)
+
+    def _primary_grouping(self) -> Expression:
+        self.advance()  # consume (
+        expr = self.expression()
+        self.consume(TokenType.RPAREN, "Ожидалась ')'")
+        return expr
+
+    def _primary_fallback(self) -> Expression:
+        """Первичные выражения вне горячего пути диспетчеризации."""
         # Векторный литерал
-        if self.match(TokenType.VECTOR_OPEN):
+        if self.match1(TokenType.VECTOR_OPEN):
             self.advance()  # consume <|
             
             elements = []
-            if not self.match(TokenType.VECTOR_CLOSE):
+            if not self.match1(TokenType.VECTOR_CLOSE):
                 elements.append(self.expression())
-                while self.match(TokenType.COMMA):
+                while self.match1(TokenType.COMMA):
                     self.advance()  # consume comma
                     elements.append(self.expression())
             
@@ -419,9 +481,9 @@ class Parser:
             self.consume(TokenType.LPAREN, "Ожидалась '('")
             
             arguments = []
-            if not self.match(TokenType.RPAREN):
+            if not self.match1(TokenType.RPAREN):
                 arguments.append(self.expression())
-                while self.match(TokenType.COMMA):
+                while self.match1(TokenType.COMMA):
                     self.advance()
                     arguments.append(self.expression())
             
@@ -434,7 +496,7 @@ class Parser:
         """Синхронизация после ошибки."""
         self.advance()
         
-        while not self.match(TokenType.EOF):
+        while not self.match1(TokenType.EOF):
             if self.tokens[self.current - 1].type == TokenType.SEMICOLON:
                 return
             
@@ -443,9 +505,39 @@ class Parser:
                 TokenType.IF, TokenType.WHILE, TokenType.RETURN,
             ):
                 return
-            
+
             self.advance()
 
+    # Таблица первичных выражений: строится в теле класса после
+    # определения обработчиков, поэтому значения — несвязанные функции
+    # и вызываются как handler(self)
+    _PRIMARY_DISPATCH: ClassVar[Dict[TokenType, Callable[['Parser'], Expression]]] = {
+        TokenType.TRUE: _primary_true,
+        TokenType.FALSE: _primary_false,
+        TokenType.NULL: _primary_null,
+        TokenType.NUMBER: _primary_number,
+        TokenType.STRING: _primary_string,
+        TokenType.IDENTIFIER: _primary_identifier,
+        TokenType.LPAREN: _primary_grouping,
+    }
+
+
+# Таблицы диспетчеризации: один hash-lookup по типу токена вместо цепочки
+# вызовов match(). Строятся после определения класса из несвязанных методов,
+# поэтому вызываются как handler(self).
+_DECLARATION_DISPATCH = {
+    TokenType.FUNCTION: Parser.function_declaration,
+    TokenType.VAR: Parser.var_declaration,
+    TokenType.CONST: Parser.var_declaration,
+}
+
+_STATEMENT_DISPATCH = {
+    TokenType.IF: Parser.if_statement,
+    TokenType.WHILE: Parser.while_statement,
+    TokenType.FOR: Parser.for_statement,
+    TokenType.RETURN: Parser.return_statement,
+    TokenType.LBRACE: Parser.block_statement,
+}
 
 def parse(tokens: List[Token]) -> Program:
     """Удобная функция для парсинга."""
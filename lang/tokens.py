@@ -1,12 +1,17 @@
 """Token definitions for the Alg-like language syntax."""
 
-from enum import Enum, auto
+from enum import IntEnum, auto
 from dataclasses import dataclass
 from typing import Any
 
 
-class TokenType(Enum):
-    """Типы токенов."""
+class TokenType(IntEnum):
+    """Типы токенов.
+
+    IntEnum вместо Enum: сравнение типов токенов в горячем пути парсера
+    сводится к сравнению малых int (без вызова Enum.__eq__), при этом
+    .name и доступ по имени члена сохраняются.
+    """
     
     # Литералы
     NUMBER = auto()
@@ -81,9 +86,14 @@ class TokenType(Enum):
     PORT = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class Token:
-    """Класс для представления токена."""
+    """Класс для представления токена.
+
+    slots=True: токены создаются по одному на лексему, и фиксированные
+    слоты вместо __dict__ на экземпляр заметно снижают расход памяти и
+    ускоряют доступ к атрибутам в горячем пути парсера.
+    """
     
     type: TokenType
     value: Any = None
@@ -1,139 +1,230 @@
 """Machine to execute programs on the stack-based processor."""
 
+from __future__ import annotations
+
 import argparse
+import os
+import stat
 import sys
 import json
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
 
-from comp.processor import StackProcessor, ProcessorError
-from isa.machine_code import MachineCode
+if TYPE_CHECKING:
+    from comp.processor import StackProcessor
 
+# Опциональный orjson: парсит JSON-расписания в разы быстрее стандартного
+# json; каждый декодер принимает bytes и кидает подкласс ValueError.
+# Связывается только сам callable — модули имеют разные типы для mypy
+_json_loads: Callable[[bytes], Any]
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+# Таблица отображения байта вывода в печатаемую форму: печатаемый ASCII и
+# перевод строки — как есть, прочее — как [код]. Индексация списка вместо
+# цепочки if/elif на каждый байт вывода.
+_BYTE_MAX = 255
+_DISP = [f"[{value}]" for value in range(_BYTE_MAX + 1)]
+for _code in range(32, 127):
+    _DISP[_code] = chr(_code)
+_DISP[10] = "\n"
+
+# Байты, проходящие в вывод без экранирования; используется для C-проверки
+# "весь вывод печатаемый" через bytes.translate и удаление
+_PASSTHROUGH = bytes(range(32, 127)) + b"\n"
+
+
+def _render_output(output: bytes | bytearray | list[int]) -> str:
+    """Отобразить байты вывода программы в текст (см. _DISP)."""
+    try:
+        raw = bytes(output)
+    except ValueError:
+        raw = None
+    if raw is not None and not raw.translate(None, _PASSTHROUGH):
+        # Быстрый путь: все байты печатаемые или '\n' — декодирование
+        # целиком в C, без питоновского цикла по значениям
+        return raw.decode('ascii')
+    return "".join(
+        _DISP[value] if 0 <= value <= _BYTE_MAX else f"[{value}]"
+        for value in output
+    )
+
+
+def _load_input(processor: StackProcessor, args: argparse.Namespace) -> None:
+    """Загрузить вход процессора: расписание, файл или stdin (пайп).
+
+    Источники взаимоисключающие, проверяются по убыванию приоритета
+    с ранним выходом — на старте выполняется ровно одна ветвь.
+    """
+    if args.schedule:
+        schedule_path = Path(args.schedule)
+        if not schedule_path.exists():
+            sys.stderr.write(f"Error: schedule file '{args.schedule}' not found\n")
+            sys.exit(1)
+        try:
+            schedule = _json_loads(schedule_path.read_bytes())
+        except (ValueError, OSError) as e:
+            sys.stderr.write(f"Schedule read error: {e}\n")
+            sys.exit(1)
+        # Ожидается ключ "input": список объектов {cycle:int, data:int};
+        # события собираются в список и планируются одним пакетом
+        events = []
+        for ev in schedule.get("input", []):
+            data = ev.get("data", 0)
+            data_val = ord(data[0]) if isinstance(data, str) and len(data) > 0 else int(data)
+            events.append((int(ev.get("cycle", 0)), data_val))
+        processor.schedule_input_events(events)
+        return
+
+    if args.input:
+        input_path = Path(args.input)
+        if not input_path.exists():
+            sys.stderr.write(f"Error: input file '{args.input}' not found\n")
+            sys.exit(1)
+        # Немедленно наполняем буфер ввода для синхронного IN;
+        # читаем сырые байты — без декодирования UTF-8 и обратного
+        # кодирования, extend работает C-циклом по bytes
+        processor.input_buffer.extend(input_path.read_bytes())
+        return
+
+    # Если вход не указан, но в stdin есть данные (запуск через пайп или
+    # перенаправление из файла), читаем их. fstat дешевле isatty: один
+    # syscall вместо ioctl, и тип дескриптора проверяется напрямую
+    try:
+        mode = os.fstat(0).st_mode
+        if stat.S_ISFIFO(mode) or stat.S_ISREG(mode):
+            processor.input_buffer.extend(sys.stdin.buffer.read())
+    except OSError:
+        # Safely ignore stdin errors, leaving the buffer empty
+        pass
+
+
+DEFAULT_MAX_CYCLES = 1000000
+
+
+def _parse_args() -> argparse.Namespace:
+    """Разобрать аргументы командной строки.
+
+    Частый вызов 'machine.py program.bin' без флагов обслуживается без
+    построения ArgumentParser — готовый Namespace с умолчаниями; полный
+    разбор остаётся для флагов и --help.
+    """
+    argv = sys.argv[1:]
+    if len(argv) == 1 and not argv[0].startswith('-'):
+        return argparse.Namespace(
+            program_file=argv[0],
+            data=None,
+            input=None,
+            output=None,
+            schedule=None,
+            log_exec=None,
+            max_cycles=DEFAULT_MAX_CYCLES,
+            verbose=False,
+        )
 
-def main() -> None:
-    """Главная функция машины."""
     parser = argparse.ArgumentParser(
         description="Machine to execute programs on the stack-based processor",
     )
-    
+
     parser.add_argument("program_file", help="Instruction memory file (.bin)")
     parser.add_argument("-d", "--data", help="Data memory file")
     parser.add_argument("-i", "--input", help="Input file (queued byte-by-byte)")
     parser.add_argument("-o", "--output", help="Output file")
     parser.add_argument("--schedule", help="JSON schedule file for input/interrupts")
     parser.add_argument("--log-exec", help="Save execution log to a file")
-    parser.add_argument("--max-cycles", type=int, default=1000000, help="Max cycles")
+    parser.add_argument("--max-cycles", type=int, default=DEFAULT_MAX_CYCLES, help="Max cycles")
     parser.add_argument("--verbose", action="store_true", help="Verbose output")
-    
-    args = parser.parse_args()
-    
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Главная функция машины."""
+    args = _parse_args()
+
+    # Ленивая загрузка тяжёлых модулей: --help и ошибочные аргументы
+    # не платят за импорт процессора и ISA
+    from comp.processor import StackProcessor, ProcessorError
+    from isa.machine_code import MachineCode
+
+    # Однократное связывание: каждый sys.stdout.write — это два поиска
+    # атрибутов, в горячем пути статусных сообщений достаточно одного имени
+    write = sys.stdout.write
+
     try:
         # Загружаем программу
         program_path = Path(args.program_file)
         if not program_path.exists():
             sys.stderr.write(f"Ошибка: файл программы '{args.program_file}' не найден\n")
             sys.exit(1)
-        
-        sys.stdout.write(f"Loading program: {args.program_file}\n")
+
         instructions = MachineCode.load_instruction_memory(str(program_path))
-        sys.stdout.write(f"Loaded {len(instructions)} instructions\n")
-        
+        write(
+            f"Loading program: {args.program_file}\n"
+            f"Loaded {len(instructions)} instructions\n",
+        )
+
         # Создаем процессор
         processor = StackProcessor()
         processor.load_program(instructions)
-        
+
         # Загружаем данные
         if args.data:
             data_path = Path(args.data)
             if data_path.exists():
-                sys.stdout.write(f"Loading data: {args.data}\n")
                 data = MachineCode.load_data_memory(str(data_path))
                 processor.load_data(data)
-                sys.stdout.write(f"Loaded {len(data)} bytes of data\n")
+                write(
+                    f"Loading data: {args.data}\n"
+                    f"Loaded {len(data)} bytes of data\n",
+                )
         
         # Загрузка входа: расписание, файл или stdin (если передан через пайп)
-        if args.schedule:
-            schedule_path = Path(args.schedule)
-            if not schedule_path.exists():
-                sys.stderr.write(f"Error: schedule file '{args.schedule}' not found\n")
-                sys.exit(1)
-            try:
-                schedule = json.loads(schedule_path.read_text(encoding='utf-8'))
-            except (json.JSONDecodeError, OSError) as e:
-                sys.stderr.write(f"Schedule read error: {e}\n")
-                sys.exit(1)
-            # Ожидается ключ "input": список объектов {cycle:int, data:int}
-            for ev in schedule.get("input", []):
-                cycle = int(ev.get("cycle", 0))
-                data = ev.get("data", 0)
-                data_val = ord(data[0]) if isinstance(data, str) and len(data) > 0 else int(data)
-                processor.schedule_input_event(cycle, data_val)
-        elif args.input:
-            input_path = Path(args.input)
-            if not input_path.exists():
-                sys.stderr.write(f"Error: input file '{args.input}' not found\n")
-                sys.exit(1)
-            content = input_path.read_text(encoding='utf-8')
-            # Немедленно наполняем буфер ввода для синхронного IN
-            for ch in content:
-                processor.input_buffer.append(ord(ch))
+        _load_input(processor, args)
+
+        # Запускаем выполнение. Журнал тактов при --log-exec пишется
+        # потоково прямо из процессора: без накопления O(тактов) строк
+        # в памяти и без повторного прохода после выполнения
+        write(f"Start execution (max {args.max_cycles} cycles)...\n")
+        if args.log_exec:
+            log_path = Path(args.log_exec)
+            with log_path.open('wb', buffering=1 << 20) as log_file:
+                result = processor.run(args.max_cycles, log_file=log_file)
+            if args.verbose:
+                write(f"Execution log saved: {args.log_exec}\n")
         else:
-            # Если вход не указан, но в stdin есть данные (запуск через пайп), читаем их
-            try:
-                if not sys.stdin.isatty():
-                    content = sys.stdin.read()
-                    for ch in content:
-                        processor.input_buffer.append(ord(ch))
-            except OSError:
-                # Safely ignore stdin errors, leaving the buffer empty
-                content = ""
-
-        # Запускаем выполнение
-        sys.stdout.write(f"Start execution (max {args.max_cycles} cycles)...\n")
-        result = processor.run(args.max_cycles)
-        
-        # Выводим результаты
-        sys.stdout.write("\n=== EXECUTION RESULTS ===\n")
-        sys.stdout.write(f"State: {result['state']}\n")
-        sys.stdout.write(f"Instructions executed: {result['instructions_executed']}\n")
-        sys.stdout.write(f"Cycles executed: {result['cycles_executed']}\n")
-        sys.stdout.write(f"Final PC: {result['final_pc']}\n")
+            result = processor.run(args.max_cycles)
         
+        # Выводим результаты одной записью вместо пяти мелких
+        write(
+            "\n=== EXECUTION RESULTS ===\n"
+            f"State: {result['state']}\n"
+            f"Instructions executed: {result['instructions_executed']}\n"
+            f"Cycles executed: {result['cycles_executed']}\n"
+            f"Final PC: {result['final_pc']}\n",
+        )
+
         # Вывод данных
         if result['output']:
-            sys.stdout.write("\nPROGRAM OUTPUT:\n")
-            output_text = ""
-            ascii_min = 32
-            ascii_max = 126
-            newline = 10
-            for value in result['output']:
-                if ascii_min <= value <= ascii_max:  # printable ASCII
-                    output_text += chr(value)
-                elif value == newline:  # newline
-                    output_text += "\n"
-                else:
-                    output_text += f"[{value}]"
-            
-            sys.stdout.write(f"{output_text}\n")
+            output_text = _render_output(result['output'])
+            write(f"\nPROGRAM OUTPUT:\n{output_text}\n")
             
             # Сохраняем вывод в файл
             if args.output:
                 output_path = Path(args.output)
                 output_path.write_text(output_text, encoding='utf-8')
-                sys.stdout.write(f"\nOutput saved to: {args.output}\n")
+                write(f"\nOutput saved to: {args.output}\n")
         
-        # Сохранить журнал тактов
-        if args.log_exec:
-            log_path = Path(args.log_exec)
-            log_path.write_text("\n".join(result.get('execution_log', [])), encoding='utf-8')
-            if args.verbose:
-                sys.stdout.write(f"Execution log saved: {args.log_exec}\n")
-
         # Успешное завершение
         if result['state'] == 'halted':
-            sys.stdout.write("\nProgram finished successfully.\n")
+            write("\nProgram finished successfully.\n")
             sys.exit(0)
         else:
-            sys.stdout.write(f"\nProgram finished with state: {result['state']}\n")
+            write(f"\nProgram finished with state: {result['state']}\n")
             sys.exit(1)
         
     except (OSError, ValueError, KeyError, TypeError, ProcessorError) as e:
@@ -0,0 +1,93 @@
+"""Тесты для peephole-прохода кодогенератора."""
+
+from typing import List, Set, Tuple
+
+from isa.opcodes import Opcode
+from lang.codegen import CodeGenerator, generate_code
+from lang.lexer import tokenize
+from lang.parser import parse
+
+
+def _compile_opcodes(source: str) -> List[int]:
+    """Скомпилировать исходник и вернуть список опкодов."""
+    machine_code = generate_code(parse(tokenize(source)))
+    return [instruction.opcode for instruction in machine_code.instructions]
+
+
+def _run_peephole(
+    ops: List[Tuple[Opcode, int]],
+    code_addr_pushes: Tuple[int, ...] = (),
+) -> Tuple[List[int], List[int], Set[int]]:
+    """Прогнать peephole на синтетическом коде.
+
+    Доступ к внутренностям генератора собран здесь, чтобы тесты
+    проверяли сам проход на точно заданных последовательностях —
+    из исходника нельзя получить переход внутрь пары PUSH+LOAD.
+    Возвращает (опкоды, операнды, индексы PUSH-ей адресов кода).
+    """
+    generator = CodeGenerator()
+    for opcode, operand in ops:
+        generator._emit(opcode, operand)  # noqa: SLF001
+    generator._code_addr_pushes.update(code_addr_pushes)  # noqa: SLF001
+    generator._peephole()  # noqa: SLF001
+    return (
+        [int(opcode) for opcode in generator._ops],  # noqa: SLF001
+        list(generator._operands),  # noqa: SLF001
+        set(generator._code_addr_pushes),  # noqa: SLF001
+    )
+
+
+def test_peephole_fuses_variable_access() -> None:
+    """Тест слияния PUSH addr + LOAD/STORE в прямые обращения."""
+    opcodes = _compile_opcodes("var x = 5; var y = x + x;")
+
+    assert Opcode.LOAD_DIRECT in opcodes
+    assert Opcode.STORE_DIRECT in opcodes
+    assert Opcode.LOAD not in opcodes
+    assert Opcode.STORE not in opcodes
+
+
+TARGETED_LOAD_INDEX = 2
+
+
+def test_peephole_keeps_pair_with_targeted_load() -> None:
+    """Тест исключения: пара не сливается, если LOAD — цель перехода."""
+    opcodes, operands, _ = _run_peephole([
+        (Opcode.JMP, TARGETED_LOAD_INDEX),
+        (Opcode.PUSH, 8),
+        (Opcode.LOAD, 0),   # цель JMP — должна остаться отдельной
+        (Opcode.HALT, 0),
+    ])
+
+    assert opcodes == [Opcode.JMP, Opcode.PUSH, Opcode.LOAD, Opcode.HALT]
+    assert operands[0] == TARGETED_LOAD_INDEX
+
+
+def test_peephole_retargets_jumps_after_fusion() -> None:
+    """Тест переадресации перехода после сжатия кода слиянием."""
+    opcodes, operands, _ = _run_peephole([
+        (Opcode.PUSH, 8),
+        (Opcode.LOAD, 0),   # сольются в LOAD_DIRECT, индексы сдвинутся
+        (Opcode.JMP, 3),    # цель — HALT
+        (Opcode.HALT, 0),
+    ])
+
+    assert opcodes == [Opcode.LOAD_DIRECT, Opcode.JMP, Opcode.HALT]
+    assert operands == [8, 2, 0]
+
+
+def test_peephole_remaps_code_addr_pushes() -> None:
+    """Тест переадресации PUSH-ей адресов функций."""
+    opcodes, operands, code_addr_pushes = _run_peephole(
+        [
+            (Opcode.PUSH, 8),
+            (Opcode.LOAD, 0),
+            (Opcode.PUSH, 3),   # адрес кода: HALT до слияния стоит на 3
+            (Opcode.HALT, 0),
+        ],
+        code_addr_pushes=(2,),
+    )
+
+    assert opcodes == [Opcode.LOAD_DIRECT, Opcode.PUSH, Opcode.HALT]
+    assert operands == [8, 2, 0]
+    assert code_addr_pushes == {1}
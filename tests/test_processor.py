@@ -9,119 +9,194 @@ from isa.opcodes import Opcode
 PUSH_VALUE = 42
 SUM_5_3 = 8
 MUL_RESULT = 16
+ELEM_VALUE = 7
+EXEC_COUNT_EIGHT = 8
 EXEC_COUNT_SIX = 6
 EXEC_COUNT_FOUR = 4
 FINAL_PC_AFTER_HALT = 3
 
+# Один процессор на модуль: reset() возвращает экземпляр в исходное
+# состояние, не перевыделяя 64 КиБ памяти данных на каждый тест
+_SHARED_PROCESSOR = StackProcessor()
 
-def test_basic_stack_operations() -> None:
+
+@pytest.fixture()
+def proc() -> StackProcessor:
+    """Переиспользуемый процессор, сброшенный перед тестом."""
+    _SHARED_PROCESSOR.reset()
+    return _SHARED_PROCESSOR
+
+
+def test_basic_stack_operations(proc: StackProcessor) -> None:
     """Тест основных стековых операций."""
-    processor = StackProcessor()
-    
     # PUSH value
-    processor.push(PUSH_VALUE)
-    assert len(processor.stack) == 1
-    assert processor.stack[0] == PUSH_VALUE
+    proc.push(PUSH_VALUE)
+    assert len(proc.stack) == 1
+    assert proc.stack[0] == PUSH_VALUE
     
     # POP
-    value = processor.pop()
+    value = proc.pop()
     assert value == PUSH_VALUE
-    assert len(processor.stack) == 0
-
+    assert len(proc.stack) == 0
+
+
+# Сценарии вида "загрузить-выполнить-проверить вершину стека" собраны в
+# один параметризованный тест: (инструкции, вершина, число инструкций)
+EXEC_CASES = [
+    pytest.param(
+        [
+            # 5 + 3 = 8
+            Instruction(Opcode.PUSH, 5),
+            Instruction(Opcode.PUSH, 3),
+            Instruction(Opcode.ADD),
+            Instruction(Opcode.HALT),
+        ],
+        SUM_5_3,
+        EXEC_COUNT_FOUR,
+        id="addition",
+    ),
+    pytest.param(
+        [
+            # запись 42 по адресу 0 и чтение обратно
+            Instruction(Opcode.PUSH, PUSH_VALUE),  # value
+            Instruction(Opcode.PUSH, 0),   # address
+            Instruction(Opcode.STORE),     # store
+            Instruction(Opcode.PUSH, 0),   # address
+            Instruction(Opcode.LOAD),      # load
+            Instruction(Opcode.HALT),
+        ],
+        PUSH_VALUE,
+        EXEC_COUNT_SIX,
+        id="store_load",
+    ),
+    pytest.param(
+        [
+            # (5 + 3) * 2 = 16
+            Instruction(Opcode.PUSH, 5),
+            Instruction(Opcode.PUSH, 3),
+            Instruction(Opcode.ADD),       # 8 on stack
+            Instruction(Opcode.PUSH, 2),
+            Instruction(Opcode.MUL),       # 16 on stack
+            Instruction(Opcode.HALT),
+        ],
+        MUL_RESULT,
+        EXEC_COUNT_SIX,
+        id="add_then_mul",
+    ),
+    pytest.param(
+        [
+            # адрес в операнде, без пары PUSH addr
+            Instruction(Opcode.PUSH, PUSH_VALUE),
+            Instruction(Opcode.STORE_DIRECT, 8),
+            Instruction(Opcode.LOAD_DIRECT, 8),
+            Instruction(Opcode.HALT),
+        ],
+        PUSH_VALUE,
+        EXEC_COUNT_FOUR,
+        id="store_load_direct",
+    ),
+    pytest.param(
+        [
+            # элемент 2 вектора [size][elem0]... по базе 0
+            Instruction(Opcode.PUSH, ELEM_VALUE),  # value
+            Instruction(Opcode.PUSH, 0),           # base
+            Instruction(Opcode.PUSH, 2),           # index
+            Instruction(Opcode.STORE_ELEM),
+            Instruction(Opcode.PUSH, 0),           # base
+            Instruction(Opcode.PUSH, 2),           # index
+            Instruction(Opcode.LOAD_ELEM),
+            Instruction(Opcode.HALT),
+        ],
+        ELEM_VALUE,
+        EXEC_COUNT_EIGHT,
+        id="store_load_elem",
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    ("instructions", "expected_top", "expected_executed"),
+    EXEC_CASES,
+)
+def test_program_execution(
+    proc: StackProcessor,
+    instructions: list,
+    expected_top: int,
+    expected_executed: int,
+) -> None:
+    """Тест выполнения программ: арифметика, память, комбинации."""
+    proc.load_program(instructions)
+    result = proc.run()
 
-def test_arithmetic_operations() -> None:
-    """Тест арифметических операций."""
-    processor = StackProcessor()
-    
-    # Тест сложения: 5 + 3 = 8
-    instructions = [
-        Instruction(Opcode.PUSH, 5),
-        Instruction(Opcode.PUSH, 3),
-        Instruction(Opcode.ADD),
-        Instruction(Opcode.HALT),
-    ]
-    
-    processor.load_program(instructions)
-    result = processor.run()
-    
     assert result['state'] == 'halted'
-    assert len(processor.stack) == 1
-    assert processor.stack[0] == SUM_5_3
+    assert len(proc.stack) == 1
+    assert proc.stack[0] == expected_top
+    assert result['instructions_executed'] == expected_executed
 
 
-def test_memory_operations() -> None:
-    """Тест операций с памятью."""
-    processor = StackProcessor()
-    
-    # Записываем значение 42 по адресу 0
+def test_stack_underflow(proc: StackProcessor) -> None:
+    """Тест переполнения стека снизу."""
+    with pytest.raises(ProcessorError):
+        proc.pop()
+
+
+def test_output(proc: StackProcessor) -> None:
+    """Тест вывода."""
     instructions = [
-        Instruction(Opcode.PUSH, PUSH_VALUE),  # value
-        Instruction(Opcode.PUSH, 0),   # address
-        Instruction(Opcode.STORE),     # store
-        Instruction(Opcode.PUSH, 0),   # address
-        Instruction(Opcode.LOAD),      # load
+        Instruction(Opcode.PUSH, 65),  # ASCII 'A'
+        Instruction(Opcode.OUT, 2),    # output single char to port 2
         Instruction(Opcode.HALT),
     ]
     
-    processor.load_program(instructions)
-    result = processor.run()
+    proc.load_program(instructions)
+    result = proc.run()
     
     assert result['state'] == 'halted'
-    assert len(processor.stack) == 1
-    assert processor.stack[0] == PUSH_VALUE
+    assert result['output'] == b'A'
 
 
-def test_stack_underflow() -> None:
-    """Тест переполнения стека снизу."""
-    processor = StackProcessor()
-    
-    with pytest.raises(ProcessorError):
-        processor.pop()
+READLINE_ADDR = 100
+READLINE_MAX = 16
 
 
-def test_output() -> None:
-    """Тест вывода."""
-    processor = StackProcessor()
-    
+def test_in_readline_buf(proc: StackProcessor) -> None:
+    r"""Тест IN_READLINE_BUF: строка читается одной инструкцией до '\n'."""
+    proc.input_buffer.extend(b"Hi!\nrest")
     instructions = [
-        Instruction(Opcode.PUSH, 65),  # ASCII 'A'
-        Instruction(Opcode.OUT, 2),    # output single char to port 2
+        Instruction(Opcode.PUSH, READLINE_ADDR),    # адрес буфера
+        Instruction(Opcode.PUSH, READLINE_MAX),     # максимальная длина
+        Instruction(Opcode.IN_READLINE_BUF),
+        Instruction(Opcode.IN),                     # байт после потреблённого '\n'
         Instruction(Opcode.HALT),
     ]
-    
-    processor.load_program(instructions)
-    result = processor.run()
-    
+
+    proc.load_program(instructions)
+    result = proc.run()
+
     assert result['state'] == 'halted'
-    assert result['output'] == [65]
+    assert bytes(proc.data_memory[READLINE_ADDR:READLINE_ADDR + 4]) == b"Hi!\x00"
+    assert proc.stack == [ord('r')]
 
 
-def test_complex_calculation() -> None:
-    """Тест сложного вычисления: (5 + 3) * 2 = 16."""
-    processor = StackProcessor()
-    
+def test_in_readline_buf_truncates_to_max_len(proc: StackProcessor) -> None:
+    """Тест IN_READLINE_BUF: длинная строка обрезается до max_len - 1 байт."""
+    proc.input_buffer.extend(b"abcdef\n")
     instructions = [
-        Instruction(Opcode.PUSH, 5),
-        Instruction(Opcode.PUSH, 3),
-        Instruction(Opcode.ADD),       # 8 on stack
-        Instruction(Opcode.PUSH, 2),
-        Instruction(Opcode.MUL),       # 16 on stack
+        Instruction(Opcode.PUSH, READLINE_ADDR),
+        Instruction(Opcode.PUSH, 3),                # место только для 2 байт + '\0'
+        Instruction(Opcode.IN_READLINE_BUF),
         Instruction(Opcode.HALT),
     ]
-    
-    processor.load_program(instructions)
-    result = processor.run()
-    
+
+    proc.load_program(instructions)
+    result = proc.run()
+
     assert result['state'] == 'halted'
-    assert len(processor.stack) == 1
-    assert processor.stack[0] == MUL_RESULT
-    assert result['instructions_executed'] == EXEC_COUNT_SIX
+    assert bytes(proc.data_memory[READLINE_ADDR:READLINE_ADDR + 3]) == b"ab\x00"
 
 
-def test_execution_stats() -> None:
+def test_execution_stats(proc: StackProcessor) -> None:
     """Тест статистики выполнения."""
-    processor = StackProcessor()
-    
     instructions = [
         Instruction(Opcode.PUSH, 1),
         Instruction(Opcode.PUSH, 2),
@@ -129,8 +204,8 @@ def test_execution_stats() -> None:
         Instruction(Opcode.HALT),
     ]
     
-    processor.load_program(instructions)
-    result = processor.run()
+    proc.load_program(instructions)
+    result = proc.run()
     
     assert result['instructions_executed'] == EXEC_COUNT_FOUR
     assert result['cycles_executed'] >= EXEC_COUNT_FOUR  # Минимум по одному такту на инструкцию
@@ -1,136 +1,344 @@
 """Translator from ALG-like source to stack-architecture machine code."""
 
-import argparse
+import os
 import sys
+from dataclasses import fields as dataclass_fields
 from pathlib import Path
-from typing import Any
+from types import SimpleNamespace
+from typing import Any, Callable
 
-from lang.lexer import tokenize, LexerError
-from lang.parser import parse, ParseError
-from lang.codegen import generate_code, CodeGenError
+_USAGE = """\
+usage: translator.py [-h] [-o OUTPUT] [--debug] [--ast] [--ast-max-nodes N]
+                     [--quiet] [--pipe] source_file
+
+Translator from ALG-like source to stack-architecture machine code
+
+positional arguments:
+  source_file           Input source file
+
+options:
+  -h, --help            show this help message and exit
+  -o, --output OUTPUT   Output base filename (default: program)
+  --debug               Write debug listing
+  --ast                 Print AST
+  --ast-max-nodes N     Skip AST printing above N nodes (default: 10000)
+  --quiet               Suppress progress messages
+  --pipe                Write length-prefixed instruction and data memory
+                        to stdout instead of files
+"""
+
+
+def _parse_args() -> SimpleNamespace:
+    """Разобрать аргументы командной строки вручную.
+
+    Флагов немного — ручной цикл по sys.argv избавляет холодный
+    старт от импорта argparse и построения парсера на каждый запуск
+    транслятора в сборочном цикле.
+    """
+    args = SimpleNamespace(source_file=None, output="program", debug=False, ast=False,
+                           ast_max_nodes=10000, quiet=False, pipe=False)
+    argv = sys.argv[1:]
+    i = 0
+    count = len(argv)
+    while i < count:
+        arg = argv[i]
+        if arg in ("-o", "--output"):
+            i += 1
+            if i >= count:
+                sys.stderr.write(f"Error: {arg} requires a value\n{_USAGE}")
+                sys.exit(2)
+            args.output = argv[i]
+        elif arg == "--debug":
+            args.debug = True
+        elif arg == "--ast":
+            args.ast = True
+        elif arg == "--ast-max-nodes":
+            i += 1
+            if i >= count:
+                sys.stderr.write(f"Error: {arg} requires a value\n{_USAGE}")
+                sys.exit(2)
+            try:
+                args.ast_max_nodes = int(argv[i])
+            except ValueError:
+                sys.stderr.write(f"Error: {arg} expects an integer\n{_USAGE}")
+                sys.exit(2)
+        elif arg == "--quiet":
+            args.quiet = True
+        elif arg == "--pipe":
+            args.pipe = True
+        elif arg in ("-h", "--help"):
+            sys.stdout.write(_USAGE)
+            sys.exit(0)
+        elif arg.startswith("-") and arg != "-":
+            sys.stderr.write(f"Error: unknown option '{arg}'\n{_USAGE}")
+            sys.exit(2)
+        elif args.source_file is None:
+            args.source_file = arg
+        else:
+            sys.stderr.write(f"Error: unexpected argument '{arg}'\n{_USAGE}")
+            sys.exit(2)
+        i += 1
+    if args.source_file is None:
+        sys.stderr.write(f"Error: source_file is required\n{_USAGE}")
+        sys.exit(2)
+    return args
+
+
+def _noop(_message: str) -> None:
+    """Пустой писатель статуса для --quiet."""
 
 
 def main() -> None:
     """Главная функция транслятора."""
-    parser = argparse.ArgumentParser(
-        description="Translator from ALG-like source to stack-architecture machine code",
-    )
-    
-    parser.add_argument(
-        "source_file",
-        help="Input source file",
-    )
-    
-    parser.add_argument(
-        "-o", "--output",
-        default="program",
-        help="Output base filename (default: program)",
-    )
-    
-    parser.add_argument(
-        "--debug",
-        action="store_true",
-        help="Write debug listing",
-    )
-    
-    parser.add_argument(
-        "--ast",
-        action="store_true",
-        help="Print AST",
-    )
-    
-    args = parser.parse_args()
-    
+    args = _parse_args()
+
+    # Ленивая загрузка компиляторного стека: --help и ошибки аргументов
+    # не платят за импорт лексера, парсера и кодогенератора
+    from lang.lexer import tokenize, LexerError
+    from lang.parser import parse, ParseError
+    from lang.codegen import generate_code, CodeGenError
+
+    # Статусные сообщения через одно связанное имя: под --quiet пишущая
+    # функция — no-op, и ветвления на каждый вызов не нужно. Под --pipe
+    # stdout занят бинарным потоком, статус уходит на stderr
+    _log: Callable[[str], object]
+    if args.quiet:
+        _log = _noop
+    elif args.pipe:
+        _log = sys.stderr.write
+    else:
+        _log = sys.stdout.write
+
     try:
-        # Читаем исходный код
+        # Читаем исходный код: сырые байты одним read и один decode —
+        # без стека TextIOWrapper; отдельная проверка exists() стоила
+        # бы лишний stat, вместо неё ловим FileNotFoundError
         source_path = Path(args.source_file)
-        if not source_path.exists():
+        try:
+            source_code = source_path.read_bytes().decode("utf-8")
+        except FileNotFoundError:
             sys.stderr.write(f"Error: file '{args.source_file}' not found\n")
             sys.exit(1)
-        
-        source_code = source_path.read_text(encoding="utf-8")
-        sys.stdout.write(f"Reading source file: {args.source_file}\n")
+        _log(f"Reading source file: {args.source_file}\n")
         
         # Лексический анализ
-        sys.stdout.write("Lexical analysis...\n")
+        _log("Lexical analysis...\n")
         tokens = tokenize(source_code)
-        sys.stdout.write(f"Found {len(tokens)} tokens\n")
+        _log(f"Found {len(tokens)} tokens\n")
         
         # Синтаксический анализ
-        sys.stdout.write("Parsing...\n")
+        _log("Parsing...\n")
         ast = parse(tokens)
-        sys.stdout.write("AST built successfully\n")
+        _log("AST built successfully\n")
         
-        if args.ast:
-            sys.stdout.write("\nAST:\n")
-            print_ast(ast, 0)
-            sys.stdout.write("\n")
+        if args.ast and args.pipe:
+            # print_ast пишет в stdout, который в --pipe занят бинарным
+            # потоком — дерево не печатаем
+            _log("AST printing skipped in --pipe mode\n")
+        elif args.ast:
+            # Форматирующий обход — O(узлов) питоновской работы;
+            # гигантское дерево никто не читает глазами, так что сперва
+            # дешёвый подсчёт и отсечка по порогу
+            total_nodes = _count_nodes(ast)
+            if total_nodes > args.ast_max_nodes:
+                _log(f"\nAST: {total_nodes} nodes "
+                     f"(printing skipped; raise with --ast-max-nodes)\n")
+            else:
+                _log("\nAST:\n")
+                print_ast(ast, 0)
+                _log("\n")
         
         # Генерация кода
-        sys.stdout.write("Generating machine code...\n")
+        _log("Generating machine code...\n")
         machine_code = generate_code(ast)
-        sys.stdout.write(f"Generated {len(machine_code.instructions)} instructions\n")
-        sys.stdout.write(f"Data memory size: {len(machine_code.data_memory)} bytes\n")
+        _log(f"Generated {len(machine_code.instructions)} instructions\n")
+        _log(f"Data memory size: {len(machine_code.data_memory)} bytes\n")
         
-        # Сохраняем файлы
         output_base = args.output
-        
-        # Память команд (бинарный файл)
-        instr_file = f"{output_base}.bin"
-        machine_code.save_instruction_memory(instr_file)
-        sys.stdout.write(f"Instruction memory saved to: {instr_file}\n")
-        
-        # Память данных (бинарный файл)
-        data_file = f"{output_base}_data.bin"
-        machine_code.save_data_memory(data_file)
-        sys.stdout.write(f"Data memory saved to: {data_file}\n")
-        
-        # Отладочный листинг
-        if args.debug:
-            debug_file = f"{output_base}_debug.txt"
-            machine_code.save_debug_listing(debug_file)
-            sys.stdout.write(f"Debug listing saved to: {debug_file}\n")
-        
-        sys.stdout.write("Translation finished successfully!\n")
+        if args.pipe:
+            # Потоковый режим для конвейеров: два u32-префикса длин и
+            # сами блобы в stdout — без промежуточных файлов и повторных
+            # open в следующем инструменте
+            import struct
+            instr_bytes = machine_code.serialize_instructions()
+            data_bytes = machine_code.serialize_data()
+            pipe_out = sys.stdout.buffer
+            pipe_out.write(struct.pack('<II', len(instr_bytes), len(data_bytes)))
+            pipe_out.write(instr_bytes)
+            pipe_out.write(data_bytes)
+            pipe_out.flush()
+            _log(f"Piped {len(instr_bytes)} instruction bytes and "
+                 f"{len(data_bytes)} data bytes to stdout\n")
+            if args.debug:
+                machine_code.save_debug_listing(f"{output_base}_debug.txt")
+                _log(f"Debug listing saved to: {output_base}_debug.txt\n")
+        else:
+            # Сохраняем все выходные файлы одним пакетным вызовом
+            machine_code.save_all(output_base, debug=args.debug)
+            _log(f"Instruction memory saved to: {output_base}.bin\n")
+            _log(f"Data memory saved to: {output_base}_data.bin\n")
+            if args.debug:
+                _log(f"Debug listing saved to: {output_base}_debug.txt\n")
+
+        _log("Translation finished successfully!\n")
         
     except LexerError as e:
         sys.stderr.write(f"Lexical error: {e}\n")
-        sys.exit(1)
+        _fail_fast()
     except ParseError as e:
         sys.stderr.write(f"Parse error: {e}\n")
-        sys.exit(1)
+        _fail_fast()
     except CodeGenError as e:
         sys.stderr.write(f"Code generation error: {e}\n")
-        sys.exit(1)
+        _fail_fast()
+
+
+def _fail_fast() -> None:
+    """Завершить процесс с кодом 1 без полного teardown интерпретатора.
+
+    os._exit пропускает atexit, gc и финализацию модулей — на ошибочных
+    путях чистить нечего (исходник читается одним read_bytes, выходные
+    файлы ещё не открыты), а потоки нужно сбросить руками.
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(1)
+
+
+# Кэш (имя класса, печатаемые поля) по классу узла: интроспекция
+# dataclass-полей, фильтрация служебных имён и поиск __name__
+# выполняются один раз на класс, но не на узел
+_CLASS_INFO: dict[type, tuple] = {}
+
+
+def _info_of(node_type: type) -> tuple:
+    """Пара (имя класса, кортеж печатаемых полей) для класса узла AST.
+
+    Поля — None, если класс не dataclass (не узел). Имя интернируется:
+    обход берёт и имя, и поля одним обращением к словарю вместо
+    поиска __name__ на каждом узле. dataclasses.fields отфильтровывает
+    ClassVar-поля вроде KIND; служебные поля с '_' (кэши
+    разрешения/свёртки) пропускаются.
+    """
+    try:
+        return _CLASS_INFO[node_type]
+    except KeyError:
+        if hasattr(node_type, '__dataclass_fields__'):
+            fields = tuple(
+                field.name
+                for field in dataclass_fields(node_type)
+                if not field.name.startswith('_')
+            )
+        else:
+            fields = None
+        info = (sys.intern(node_type.__name__), fields)
+        _CLASS_INFO[node_type] = info
+        return info
+
+
+def _count_nodes(root: Any) -> int:
+    """Подсчитать узлы AST итеративным обходом без форматирования.
+
+    Использует тот же кэш полей, что и print_ast, но не строит строк —
+    на порядок дешевле полного вывода дерева.
+    """
+    total = 0
+    stack: list = [root]
+    while stack:
+        node = stack.pop()
+        fields = _info_of(type(node))[1]
+        if fields is None:
+            continue
+        total += 1
+        for name in fields:
+            value = getattr(node, name)
+            if value.__class__ is list:
+                stack.extend(value)
+            else:
+                stack.append(value)
+    return total
+
+
+# Кэш строк отступа по уровню вложенности: "  " * level создавал бы
+# новую строку на каждый узел, уровней же в дереве на порядки меньше
+_INDENTS: list = [""]
+
+# Табличная классификация значений полей: один поиск по точному типу
+# вместо цепочки предикатов (is list / dataclass / __dict__) на каждое
+# поле — скаляры и списки, подавляющее большинство значений, решаются
+# одним dict.get без getattr-проверок
+_KIND_LIST = 1
+_KIND_SCALAR = 2
+_VALUE_KIND = {
+    list: _KIND_LIST,
+    tuple: _KIND_LIST,
+    int: _KIND_SCALAR,
+    float: _KIND_SCALAR,
+    bool: _KIND_SCALAR,
+    str: _KIND_SCALAR,
+    type(None): _KIND_SCALAR,
+}
 
 
 def print_ast(node: Any, indent: int) -> None:
-    """Вывести AST в читаемом виде."""
-    indent_str = "  " * indent
-    
-    if hasattr(node, "__class__"):
-        class_name = node.__class__.__name__
-        sys.stdout.write(f"{indent_str}{class_name}\n")
-        
-        # Печатаем поля узла
-        if hasattr(node, "__dict__"):
-            for key, value in node.__dict__.items():
-                if key.startswith("_"):
-                    continue
-
-                sys.stdout.write(f"{indent_str}  {key}:")
-
-                if isinstance(value, list):
-                    sys.stdout.write("\n")
-                    for item in value:
-                        print_ast(item, indent + 2)
-                elif hasattr(value, "__class__") and hasattr(value, "__dict__"):
-                    sys.stdout.write("\n")
-                    print_ast(value, indent + 2)
+    """Вывести AST в читаемом виде.
+
+    Итеративный обход с явным стеком вместо рекурсии (без питоновского
+    кадра на узел) и накоплением строк в список: весь вывод уходит в
+    stdout одной записью. Элементы стека — либо (узел, отступ), либо
+    готовая строка; дети кладутся в обратном порядке, чтобы порядок
+    вывода совпадал с рекурсивным.
+    """
+    out: list = []
+    stack: list = [(node, indent)]
+    while stack:
+        entry = stack.pop()
+        if isinstance(entry, str):
+            out.append(entry)
+            continue
+        current, level = entry
+        indents = _INDENTS
+        while len(indents) <= level:
+            indents.append(indents[-1] + "  ")
+        indent_str = indents[level]
+        class_name, fields = _info_of(type(current))
+        out.append(f"{indent_str}{class_name}\n")
+
+        if fields is not None:
+            items = ((name, getattr(current, name)) for name in fields)
+        else:
+            # Объект без dataclass-полей, имеющий __dict__ (легаси-путь):
+            # имена нельзя кэшировать
+            # по классу, фильтруем на месте
+            node_dict = getattr(current, '__dict__', None)
+            if node_dict is None:
+                continue
+            items = ((key, value) for key, value in node_dict.items()
+                     if not key.startswith('_'))
+        pending: list = []
+        for key, value in items:
+            kind = _VALUE_KIND.get(value.__class__)
+            if kind == _KIND_SCALAR:
+                pending.append(f"{indent_str}  {key}: {value}\n")
+            elif kind == _KIND_LIST:
+                pending.append(f"{indent_str}  {key}:\n")
+                for item in value:
+                    pending.append((item, level + 2))
+            elif (child_info := _info_of(value.__class__))[1] is not None:
+                pending.append(f"{indent_str}  {key}:\n")
+                if child_info[1]:
+                    pending.append((value, level + 2))
                 else:
-                    sys.stdout.write(f" {value}\n")
-    else:
-        sys.stdout.write(f"{indent_str}{node}\n")
+                    # Лист без печатаемых полей: готовая строка вместо
+                    # повторного входа в цикл ради одного имени класса
+                    pending.append(f"{indent_str}    {child_info[0]}\n")
+            elif getattr(value, '__dict__', None) is not None:
+                pending.append(f"{indent_str}  {key}:\n")
+                pending.append((value, level + 2))
+            else:
+                pending.append(f"{indent_str}  {key}: {value}\n")
+        stack.extend(reversed(pending))
+    sys.stdout.write("".join(out))
 
 
 if __name__ == "__main__":